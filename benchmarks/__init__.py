@@ -0,0 +1 @@
+"""Offline benchmark harness for the crawler (page corpus + local LLM/S3 stand-ins)."""
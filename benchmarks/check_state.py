@@ -0,0 +1,173 @@
+"""Consistency checks for the state DB's key layout and legacy migration.
+
+Builds a state DB in the pre-interning layout (one `urls` table keyed by the
+full URL, as the original scripts created it) and checks that:
+
+  - migrating it keeps every URL, status, depth and timestamp
+  - a migration interrupted half-way leaves the legacy table untouched
+  - a leftover `urls_legacy` next to a partly filled frontier is migrated again
+  - with the URL hash forced down to 8 slots, so nearly every insert collides and
+    is probed, add / update / export / drop / import / bulk add and claims
+    still find every URL exactly once
+
+    python -m benchmarks.check_state                  # 20k URLs
+    python -m benchmarks.check_state --urls 150000    # closer to a real crawl
+
+Exits non-zero on the first failed check.
+"""
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+import crawlai.state as state
+from crawlai.state import StateManager
+
+LEGACY_TABLE = """
+    CREATE TABLE urls (
+        url TEXT PRIMARY KEY,
+        status TEXT DEFAULT 'pending',
+        depth INTEGER DEFAULT 0,
+        last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def check(ok, message):
+    if not ok:
+        sys.exit(f"[CHECK] FAILED: {message}")
+
+
+def sample_urls(n):
+    rng = random.Random(1)
+    urls = [f"https://forum.rclone.org/t/topic-slug-{i}/{100000 + i}" + (f"/{rng.randint(2, 40)}" if i % 3 else "")
+            for i in range(n)]
+    return urls + ["https://rclone.org", "https://rclone.org/", "https://rclone.org/docs", "https://rclone.org/?q=1"]
+
+
+def build_legacy(path, urls):
+    rng = random.Random(2)
+    statuses = ["pending"] * 6 + ["completed"] * 3 + ["failed"]
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute(LEGACY_TABLE)
+        conn.executemany("INSERT INTO urls VALUES (?, ?, ?, datetime(?, 'unixepoch'))",
+                         ((url, rng.choice(statuses), rng.randint(0, 5), 1700000000 + rng.randint(0, 10 ** 7)) for url in urls))
+        conn.commit()
+
+
+def rows(path, table="urls"):
+    with closing(sqlite3.connect(path)) as conn:
+        return sorted(conn.execute(f"SELECT url, status, depth, last_updated FROM {table}"))
+
+
+def tables(path):
+    with closing(sqlite3.connect(path)) as conn:
+        return sorted(row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'"))
+
+
+def check_migration(directory, n):
+    legacy = os.path.join(directory, "legacy.db")
+    build_legacy(legacy, sample_urls(n))
+    expected = rows(legacy)
+
+    path = os.path.join(directory, "migrated.db")
+    shutil.copy(legacy, path)
+    t_start = time.time()
+    StateManager(path)
+    check(rows(path) == expected, "migrated rows differ from the legacy table")
+    check("urls_legacy" not in tables(path), "urls_legacy left behind")
+    StateManager(path)
+    check(rows(path) == expected, "reopening a migrated DB changed it")
+    print(f"[CHECK] migration of {len(expected)} URLs ok ({time.time() - t_start:.1f}s, "
+          f"{os.path.getsize(legacy) // 1024} KB -> {os.path.getsize(path) // 1024} KB)")
+
+    # Interrupted half-way: the whole migration must roll back
+    path = os.path.join(directory, "interrupted.db")
+    shutil.copy(legacy, path)
+    stage, batch, calls = StateManager._stage, state.MIGRATE_BATCH, []
+
+    def failing_stage(self, conn, staged):
+        calls.append(1)
+        if len(calls) == 2: raise KeyboardInterrupt
+        return stage(self, conn, staged)
+
+    StateManager._stage, state.MIGRATE_BATCH = failing_stage, max(1, len(expected) // 4)
+    try:
+        StateManager(path)
+        check(False, "the interrupted migration did not raise")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        StateManager._stage, state.MIGRATE_BATCH = stage, batch
+    check(tables(path) == ["urls"] and rows(path) == expected, "an interrupted migration left changes behind")
+    StateManager(path)
+    check(rows(path) == expected, "migrating after an interruption lost rows")
+    print("[CHECK] interrupted migration rolls back ok")
+
+    # What a crash between rename and drop left before the migration was atomic
+    path = os.path.join(directory, "leftover.db")
+    shutil.copy(os.path.join(directory, "migrated.db"), path)
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("ATTACH DATABASE ? AS legacy", (legacy,))
+        conn.execute("CREATE TABLE urls_legacy AS SELECT * FROM legacy.urls")
+        conn.execute("DELETE FROM frontier WHERE id % 3 = 0")
+        conn.commit()
+    StateManager(path)
+    check(rows(path) == expected and "urls_legacy" not in tables(path), "a leftover urls_legacy was not migrated")
+    print("[CHECK] leftover urls_legacy is migrated ok")
+
+
+def check_collisions(directory):
+    url_hash = state.url_hash
+    # 8 slots: nearly every URL collides and is probed, and deletes break probe chains
+    state.url_hash = lambda url: int(hashlib.md5(url.encode("utf-8")).hexdigest(), 16) % 8 - 4
+    try:
+        s = StateManager(os.path.join(directory, "collide.db"))
+        urls = [f"https://rclone.org/p{i}/" for i in range(40)] + [f"https://forum.rclone.org/t/x/{i}" for i in range(40)]
+        s.add_urls(urls[:30])
+        s.add_urls(urls[20:])
+        s.add_urls(urls)
+        check(sorted(s.urls_with_status("pending")) == sorted(urls), "overlapping adds lost or duplicated URLs")
+        for url in urls[::2]: s.update_status(url, "completed")
+        check(sorted(s.urls_with_status("completed")) == sorted(urls[::2]), "updates hit the wrong rows")
+
+        forum = lambda url: "forum." in url
+        handoff = os.path.join(directory, "handoff.db")
+        check(s.export_urls(handoff, forum) == 40, "export did not copy the whole shard")
+        other = StateManager(handoff)
+        check(all(other.url_status(url) for url in urls[40:]), "exported URLs can't be found in the handoff")
+        check(s.drop_urls(forum) == 40, "drop did not remove the whole shard")
+        check(all(s.url_status(url) for url in urls[:40]), "rows probed past dropped ones can't be found")
+        check(not any(s.url_status(url) for url in urls[40:]), "dropped URLs are still found")
+        check(s.import_urls(handoff, forum) == 40, "import did not restore the shard")
+        for i, url in enumerate(urls):
+            check(s.url_status(url)[0] == ("completed" if i % 2 == 0 else "pending"), f"wrong status after import: {url}")
+
+        s.add_urls_bulk([(url, 0, 10 ** 10) for url in urls])
+        check(len(s.urls_with_status("pending")) == 80, "bulk add duplicated or lost URLs")
+        claimed = [s.claim_pending_url(skip=forum) for _ in range(41)]
+        check(sorted(row[0] for row in claimed if row) == sorted(urls[:40]) and claimed[-1] is None,
+              "claims skipped the wrong URLs")
+        print("[CHECK] 8-slot hash: add, update, export, drop, import, bulk add and claim ok")
+    finally:
+        state.url_hash = url_hash
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the state DB's key layout and legacy migration.")
+    parser.add_argument("--urls", type=int, default=20000, help="URLs in the legacy DB to migrate")
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        check_migration(directory, args.urls)
+        check_collisions(directory)
+    print("[CHECK] all state checks passed")
+
+
+if __name__ == "__main__":
+    main()
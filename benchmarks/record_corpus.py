@@ -0,0 +1,72 @@
+"""Record live pages into benchmarks/corpus/<host>/<path>/index.html.
+
+The stored bytes are exactly what the server returned; CorpusServer rewrites
+absolute links to the local stand-ins at serve time.
+
+    python -m benchmarks.record_corpus                       # refresh the default page set
+    python -m benchmarks.record_corpus https://forum.rclone.org/t/some-topic/12345
+"""
+import argparse
+import os
+import sys
+import urllib.request
+from urllib.parse import urlparse
+
+from benchmarks.stubs import CORPUS_DIR
+
+DEFAULT_PAGES = [
+    "https://rclone.org/",
+    "https://rclone.org/sitemap.xml",
+    "https://rclone.org/docs/",
+    "https://rclone.org/commands/rclone_copy/",
+    "https://rclone.org/commands/rclone_sync/",
+    "https://rclone.org/s3/",
+    "https://rclone.org/install/",
+    "https://rclone.org/filtering/",
+    "https://forum.rclone.org/",
+    "https://forum.rclone.org/latest",
+    "https://forum.rclone.org/t/mounting-rclone-to-use-like-a-local-drive/25604",
+    "https://forum.rclone.org/t/error-when-multiple-instances-of-rclone-running-all-with-the-rc-flag/25856",
+    "https://forum.rclone.org/t/s3-upload-slow-with-many-small-files/31234",
+]
+
+
+def corpus_path(url, corpus_dir=CORPUS_DIR):
+    parsed = urlparse(url)
+    path = parsed.path.strip("/")
+    # Files with an extension (sitemaps) are stored as-is, pages as <path>/index.html
+    if os.path.splitext(path)[1]:
+        return os.path.join(corpus_dir, parsed.netloc, path)
+    return os.path.join(corpus_dir, parsed.netloc, path, "index.html")
+
+
+def record(url, corpus_dir=CORPUS_DIR):
+    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0 (crawlai benchmark recorder)"})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        body = resp.read()
+    target = corpus_path(url, corpus_dir)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "wb") as f:
+        f.write(body)
+    return target, len(body)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record pages into the offline benchmark corpus.")
+    parser.add_argument("urls", nargs="*", help=f"pages to record (default: {len(DEFAULT_PAGES)} representative pages)")
+    parser.add_argument("--corpus-dir", default=CORPUS_DIR)
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for url in args.urls or DEFAULT_PAGES:
+        try:
+            target, size = record(url, args.corpus_dir)
+            print(f"  [REC] {url} -> {os.path.relpath(target, args.corpus_dir)} ({size / 1024:.1f} KB)")
+        except Exception as e:
+            failed += 1
+            print(f"  [REC ERR] {url}: {e}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
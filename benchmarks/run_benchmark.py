@@ -0,0 +1,232 @@
+"""Offline crawl benchmark.
+
+Runs the crawl pipeline end to end against the page corpus (synthetic unless re-recorded, see README.md), the stub LLM and the
+stub S3 server, one subprocess per repetition so CPU time and peak RSS are not
+shared between runs.
+
+    python -m benchmarks.run_benchmark                      # all scenarios, 3 reps
+    python -m benchmarks.run_benchmark -s baseline -r 5 -o before.json
+    python -m benchmarks.run_benchmark -o after.json --compare before.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.stubs import CorpusServer, StubLLMServer, StubS3Server
+from crawlai.memory import tree_rss_kb
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = ("fetch", "prune", "llm", "upload", "discover", "total")
+
+SCENARIOS = {
+    # Steady LLM, frontier discovered link by link from START_URL
+    "baseline": {"llm_latency": 0.5, "llm_jitter": 0.2, "llm_rpm": 0, "llm_error_every": 0, "page_delay": 0.0, "sitemaps": False},
+    # Same, but the frontier is seeded from the corpus sitemaps up front
+    "sitemap": {"llm_latency": 0.5, "llm_jitter": 0.2, "llm_rpm": 0, "llm_error_every": 0, "page_delay": 0.0, "sitemaps": True},
+    # Provider pushing back: RPM cap plus periodic 429s
+    "rate-limited": {"llm_latency": 0.5, "llm_jitter": 0.2, "llm_rpm": 20, "llm_error_every": 5, "page_delay": 0.0, "sitemaps": False},
+    # Four pages in flight against the same stand-ins
+    "workers-4": {"llm_latency": 0.5, "llm_jitter": 0.2, "llm_rpm": 0, "llm_error_every": 0, "page_delay": 0.0, "sitemaps": True, "workers": 4},
+    # Slow origin (forum under load)
+    "slow-origin": {"llm_latency": 0.5, "llm_jitter": 0.2, "llm_rpm": 0, "llm_error_every": 0, "page_delay": 0.8, "sitemaps": False},
+    # Two cluster nodes (one process, separate state DBs) sharing the stub S3 bucket
+    "cluster-2": {"llm_latency": 0.5, "llm_jitter": 0.2, "llm_rpm": 0, "llm_error_every": 0, "page_delay": 0.0, "sitemaps": True, "nodes": 2},
+    # Generation-bound model (~250 output tokens/s): compact schema vs the full Markdown rewrite
+    "output-bound": {"llm_latency": 0.2, "llm_jitter": 0.1, "llm_token_latency": 0.004, "llm_rpm": 0, "llm_error_every": 0, "page_delay": 0.0, "sitemaps": False},
+    "output-bound-full": {"llm_latency": 0.2, "llm_jitter": 0.1, "llm_token_latency": 0.004, "llm_rpm": 0, "llm_error_every": 0, "page_delay": 0.0, "sitemaps": False,
+                          "extract_schema": "full"},
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; None for an empty list."""
+    if not values: return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values):
+    return {
+        "n": len(values),
+        "mean": statistics.fmean(values) if values else None,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+    }
+
+
+class TreeRSSSampler(threading.Thread):
+    """Sample RSS of this process plus all descendants (Chromium) from /proc."""
+
+    def __init__(self, interval=0.25):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_kb = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        if not os.path.isdir("/proc"): return
+        while not self.stopped.is_set():
+            self.peak_kb = max(self.peak_kb, tree_rss_kb())
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+async def crawl_nodes(configs, on_page_stats):
+    from crawlai.pipeline import crawl
+
+    await asyncio.gather(*(crawl(config, on_page_stats) for config in configs))
+
+
+def run_worker(name, params):
+    """Run one crawl in this process and return its metrics dict."""
+    from crawlai.config import build_config
+
+    corpus = CorpusServer(page_delay=params["page_delay"]).start()
+    llm = StubLLMServer(latency=params["llm_latency"], jitter=params["llm_jitter"], token_latency=params.get("llm_token_latency", 0.0),
+                        rpm=params["llm_rpm"], error_every=params["llm_error_every"]).start()
+    s3 = StubS3Server().start()
+
+    docs_url, forum_url = corpus.url_for("rclone.org"), corpus.url_for("forum.rclone.org")
+    nodes = params.get("nodes", 0)
+    # Short ticks and idle timeout so the nodes converge and stop within the run
+    cluster = {"cluster_shards": 8, "cluster_tick": 1, "cluster_idle_seconds": 3, "cluster_lease_seconds": 30} if nodes else {}
+    configs = [build_config(
+        "nvidia-colab",
+        start_url=docs_url + "/",
+        allowed_domains=["127.0.0.1"],
+        sitemap_urls=[docs_url + "/sitemap.xml", forum_url + "/sitemap.xml"] if params["sitemaps"] else [],
+        s3={"endpoint_url": s3.url, "access_key": "bench", "secret_key": "bench", "bucket": "crawlai-bench"},
+        nvidia={"api_key": "bench", "base_url": llm.url, "model": "stub"},
+        workers=params.get("workers", 1),
+        extract_schema=params.get("extract_schema"),
+        # Keep retries of failed pages inside the measured run
+        retry_base_delay=1,
+        retry_max_delay=5,
+        db_path=f"node{i}.db" if nodes else None,
+        node_id=f"node{i}" if nodes else None,
+        **cluster,
+    ) for i in range(max(nodes, 1))]
+    pages = []
+
+    workdir = tempfile.mkdtemp(prefix=f"crawlai-bench-{name}-")
+    os.chdir(workdir)
+    sampler = TreeRSSSampler()
+    sampler.start()
+    usage_before = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+    t_start = time.perf_counter()
+    with open(os.path.join(workdir, "crawl.log"), "w") as log, contextlib.redirect_stdout(log):
+        asyncio.run(crawl_nodes(configs, pages.append))
+    wall = time.perf_counter() - t_start
+    usage_after = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+    sampler.stop()
+
+    cpu = {kind: sum(getattr(after, field) - getattr(before, field) for before, after in zip(usage_before, usage_after))
+           for kind, field in (("user", "ru_utime"), ("sys", "ru_stime"))}
+    result = {
+        "scenario": name,
+        "pages": len(pages),
+        "wall_s": wall,
+        "pages_per_sec": len(pages) / wall if wall else 0.0,
+        "cpu_user_s": cpu["user"],
+        "cpu_sys_s": cpu["sys"],
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_tree_rss_mb": sampler.peak_kb / 1024,
+        "llm_calls": llm.calls,
+        "llm_rate_limited": llm.rate_limited,
+        "llm_completion_tokens": llm.completion_tokens,
+        "s3_objects": sum(len(objects) for objects in s3.buckets.values()),
+        "stages": {stage: summarize([p[stage] for p in pages if stage in p]) for stage in STAGES},
+        "workdir": workdir,
+    }
+    for server in (corpus, llm, s3): server.stop()
+    return result
+
+
+def run_scenario(name, repeat):
+    runs = []
+    for i in range(repeat):
+        proc = subprocess.run([sys.executable, "-m", "benchmarks.run_benchmark", "--worker", name],
+                              cwd=REPO_ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            sys.stderr.write(proc.stderr)
+            raise SystemExit(f"[BENCH] {name} run {i + 1} failed")
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        print(f"  [RUN] {name} #{i + 1}: {runs[-1]['pages']} pages in {runs[-1]['wall_s']:.1f}s")
+    return {
+        "scenario": name,
+        "params": SCENARIOS[name],
+        "repeat": repeat,
+        "pages_per_sec": statistics.median(r["pages_per_sec"] for r in runs),
+        "cpu_s": statistics.median(r["cpu_user_s"] + r["cpu_sys_s"] for r in runs),
+        "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+        "peak_tree_rss_mb": max(r["peak_tree_rss_mb"] for r in runs),
+        # Median across repetitions of each run's per-stage percentiles
+        "stages": {stage: {k: statistics.median(r["stages"][stage][k] for r in runs if r["stages"][stage][k] is not None)
+                           for k in ("mean", "p50", "p90", "p99") if any(r["stages"][stage][k] is not None for r in runs)}
+                   for stage in STAGES},
+        "runs": runs,
+    }
+
+
+def print_report(results, baseline=None):
+    base = {r["scenario"]: r for r in (baseline or [])}
+    print("\n" + "-" * 100)
+    print(f"{'Scenario':<14} | {'pages/s':>8} | {'CPU s':>7} | {'RSS MB':>7} | {'tree MB':>8} | " + " | ".join(f"{s + ' p50/p90':>17}" for s in ("fetch", "llm", "upload")))
+    print("-" * 100)
+    for r in results:
+        stages = " | ".join(f"{r['stages'][s].get('p50', 0):>7.3f}/{r['stages'][s].get('p90', 0):<8.3f}" for s in ("fetch", "llm", "upload"))
+        print(f"{r['scenario']:<14} | {r['pages_per_sec']:>8.3f} | {r['cpu_s']:>7.1f} | {r['peak_rss_mb']:>7.0f} | {r['peak_tree_rss_mb']:>8.0f} | {stages}")
+        if r["scenario"] in base:
+            b = base[r["scenario"]]
+            delta = (r["pages_per_sec"] / b["pages_per_sec"] - 1) * 100 if b["pages_per_sec"] else 0.0
+            print(f"{'  vs baseline':<14} | {delta:>+7.1f}% | {r['cpu_s'] - b['cpu_s']:>+7.1f} | {r['peak_rss_mb'] - b['peak_rss_mb']:>+7.0f} | {r['peak_tree_rss_mb'] - b['peak_tree_rss_mb']:>+8.0f} |")
+    print("-" * 100)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline crawl benchmark (no network required).")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="scenario to run (repeatable, default: all)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="repetitions per scenario (default 3)")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--compare", help="results JSON from an earlier run to diff against")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = run_worker(args.worker, SCENARIOS[args.worker])
+        print(json.dumps(result))
+        return
+
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        print(f"[BENCH] {name} x{args.repeat}")
+        results.append(run_scenario(name, args.repeat))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f: baseline = json.load(f)["results"]
+    print_report(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"[BENCH] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
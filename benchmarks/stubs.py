@@ -0,0 +1,405 @@
+"""Local stand-ins for rclone.org, the NVIDIA (OpenAI-compatible) API and Wasabi S3.
+
+Every server binds to 127.0.0.1 on a free port and runs in a daemon thread, so the
+whole crawl pipeline can be exercised on a machine with no network access.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.sax.saxutils import escape
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/plain", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+class BackgroundServer:
+    """Run a handler class on 127.0.0.1:<free port> in a daemon thread."""
+
+    def __init__(self, handler_cls):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# --- Page corpus ---
+
+class CorpusServer:
+    """Serve one corpus host from corpus/<host>/ ("/a/b" -> a/b/index.html or a/b).
+
+    Absolute links to any corpus host are rewritten at serve time to point at
+    the matching local server, so recordings stay byte-identical on disk.
+    """
+
+    def __init__(self, hosts=("rclone.org", "forum.rclone.org"), corpus_dir=CORPUS_DIR, page_delay=0.0):
+        self.corpus_dir = corpus_dir
+        self.servers = {}
+        for host in hosts:
+            self.servers[host] = BackgroundServer(self._make_handler(host, page_delay))
+
+    def _make_handler(self, host, page_delay):
+        corpus = self
+
+        class Handler(_QuietHandler):
+            def do_GET(self):
+                path = unquote(urlparse(self.path).path).strip("/")
+                root = os.path.join(corpus.corpus_dir, host)
+                candidates = [os.path.join(root, path, "index.html"), os.path.join(root, path)]
+                for candidate in candidates:
+                    # Never serve files outside the host directory
+                    if os.path.isfile(candidate) and os.path.abspath(candidate).startswith(os.path.abspath(root)):
+                        with open(candidate, "rb") as f: body = f.read()
+                        if page_delay: time.sleep(page_delay)
+                        content_type = "application/xml" if candidate.endswith(".xml") else "text/html; charset=utf-8"
+                        return self._send(200, corpus.rewrite(body), content_type)
+                self._send(404, b"<html><body><h1>404 Not Found</h1></body></html>", "text/html")
+
+            do_HEAD = do_GET
+
+        return Handler
+
+    def rewrite(self, body):
+        # Longest host first so "forum.rclone.org" is not clobbered by "rclone.org"
+        for host in sorted(self.servers, key=len, reverse=True):
+            local = self.servers[host].url.encode()
+            body = body.replace(b"https://" + host.encode(), local).replace(b"http://" + host.encode(), local)
+        return body
+
+    def url_for(self, host):
+        return self.servers[host].url
+
+    def start(self):
+        for server in self.servers.values(): server.start()
+        return self
+
+    def stop(self):
+        for server in self.servers.values(): server.stop()
+
+
+# --- OpenAI-compatible LLM stand-in ---
+
+class StubLLMServer:
+    """Minimal /v1/chat/completions endpoint with configurable latency and 429s.
+
+    latency/jitter: seconds slept per call (jitter is seeded, so runs repeat).
+    token_latency: extra seconds per output token, to model output-bound generation.
+    rpm: requests allowed per trailing 60s window before answering 429 (0 = unlimited).
+    error_every: answer every Nth call with 429 regardless of rpm (0 = never).
+    max_tokens in the request cuts the output (finish_reason "length") like a real provider.
+    """
+
+    def __init__(self, latency=0.5, jitter=0.2, token_latency=0.0, rpm=0, error_every=0, seed=0):
+        self.latency, self.jitter, self.token_latency = latency, jitter, token_latency
+        self.rpm, self.error_every = rpm, error_every
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = deque()
+        self.calls = 0
+        self.rate_limited = 0
+        self.completion_tokens = 0
+        self.server = BackgroundServer(self._make_handler())
+
+    def _admit(self):
+        """Return (allowed, sleep_seconds) for the next call."""
+        with self.lock:
+            self.calls += 1
+            now = time.time()
+            while self.window and now - self.window[0] > 60:
+                self.window.popleft()
+            limited = (self.error_every and self.calls % self.error_every == 0) or (self.rpm and len(self.window) >= self.rpm)
+            if limited:
+                self.rate_limited += 1
+                return False, 0.0
+            self.window.append(now)
+            return True, self.latency + self.random.uniform(0, self.jitter)
+
+    @staticmethod
+    def fake_extraction(prompt):
+        title = re.search(r"<title[^>]*>(.*?)</title>|<h1[^>]*>(.*?)</h1>", prompt, re.S | re.I)
+        title = re.sub(r"<[^>]+>", "", (title.group(1) or title.group(2)) if title else "Untitled").strip()
+        snippets = [re.sub(r"<[^>]+>", "", s).strip() for s in re.findall(r"<pre[^>]*>(.*?)</pre>", prompt, re.S | re.I)]
+        text = re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", prompt.split("HTML:", 1)[-1])).strip()
+        if "'summary'" in prompt:
+            body = json.dumps({"title": title, "summary": text[:400], "code_snippets": snippets[:8], "category": "documentation"})
+        else:
+            body = json.dumps({"title": title, "content": text[:2000], "code_snippets": snippets[:10]})
+        # The real model usually fences its JSON, so exercise clean_llm_json as well
+        return f"```json\n{body}\n```"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(_QuietHandler):
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    return self._send(404, b'{"error": {"message": "not found"}}', "application/json")
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                allowed, delay = stub._admit()
+                if not allowed:
+                    body = json.dumps({"error": {"message": "Too Many Requests", "type": "rate_limit_exceeded", "code": 429}}).encode()
+                    return self._send(429, body, "application/json", {"Retry-After": "1"})
+                prompt = payload.get("messages", [{}])[-1].get("content", "")
+                content, finish_reason = stub.fake_extraction(prompt), "stop"
+                max_tokens = payload.get("max_tokens")
+                if max_tokens and len(content) // 4 > max_tokens:
+                    content, finish_reason = content[:max_tokens * 4], "length"
+                with stub.lock:
+                    stub.completion_tokens += len(content) // 4
+                time.sleep(delay + len(content) // 4 * stub.token_latency)
+                body = json.dumps({
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": payload.get("model", "stub"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+                    "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4, "total_tokens": (len(prompt) + len(content)) // 4},
+                }).encode()
+                self._send(200, body, "application/json")
+
+        return Handler
+
+    @property
+    def url(self):
+        return self.server.url + "/v1"
+
+    def start(self):
+        self.server.start()
+        return self
+
+    def stop(self):
+        self.server.stop()
+
+
+# --- S3 stand-in ---
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _decode_aws_chunked(raw):
+    """Strip aws-chunked framing (<hex>[;ext]\\r\\n<data>\\r\\n ... 0\\r\\n<trailers>)."""
+    out, pos = bytearray(), 0
+    while True:
+        eol = raw.index(b"\r\n", pos)
+        size = int(raw[pos:eol].split(b";")[0], 16)
+        if size == 0:
+            return bytes(out)
+        out += raw[eol + 2:eol + 2 + size]
+        pos = eol + 2 + size + 2
+
+
+class StubS3Server:
+    """In-memory S3 subset used by the crawler and tools.
+
+    Supports Put/Get/Head/Delete object (with Range and If-Match/If-None-Match
+    preconditions), ListObjectsV2 and multipart uploads, so boto3's upload_file /
+    download_file / paginators work unchanged. Buckets are created on first use.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.uploads = {}
+        self.server = BackgroundServer(self._make_handler())
+
+    def objects(self, bucket):
+        return self.buckets.setdefault(bucket, {})
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(_QuietHandler):
+            def _target(self):
+                parsed = urlparse(self.path)
+                host = (self.headers.get("Host") or "").split(":")[0]
+                path = unquote(parsed.path)
+                if host not in ("127.0.0.1", "localhost") and "." in host:
+                    bucket, key = host.split(".")[0], path.lstrip("/")
+                else:
+                    bucket, _, key = path.lstrip("/").partition("/")
+                return bucket, key, {k: v[0] for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+
+            def _body(self):
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    raw = bytearray()
+                    while True:
+                        size = int(self.rfile.readline().split(b";")[0], 16)
+                        if size == 0:
+                            while self.rfile.readline() not in (b"\r\n", b""): pass
+                            break
+                        raw += self.rfile.read(size)
+                        self.rfile.readline()
+                    raw = bytes(raw)
+                else:
+                    raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if "aws-chunked" in self.headers.get("Content-Encoding", "") or self.headers.get("x-amz-decoded-content-length"):
+                    raw = _decode_aws_chunked(raw)
+                return raw
+
+            def _error(self, status, code):
+                body = f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><Error><Code>{code}</Code><Message>{code}</Message></Error>".encode()
+                self._send(status, body, "application/xml")
+
+            def _precondition_failed(self, existing):
+                if_none_match = self.headers.get("If-None-Match")
+                if_match = self.headers.get("If-Match")
+                if if_none_match == "*" and existing is not None:
+                    return True
+                if if_match is not None and (existing is None or existing[1].strip('"') != if_match.strip('"')):
+                    return True
+                return False
+
+            def do_PUT(self):
+                bucket, key, query = self._target()
+                body = self._body()
+                if not key:
+                    stub.objects(bucket)
+                    return self._send(200)
+                if "uploadId" in query:
+                    etag = hashlib.md5(body).hexdigest()
+                    with stub.lock:
+                        stub.uploads[query["uploadId"]]["parts"][int(query["partNumber"])] = (body, etag)
+                    return self._send(200, headers={"ETag": f'"{etag}"'})
+                with stub.lock:
+                    objects = stub.objects(bucket)
+                    if self._precondition_failed(objects.get(key)):
+                        return self._error(412, "PreconditionFailed")
+                    etag = hashlib.md5(body).hexdigest()
+                    objects[key] = (body, etag, time.time())
+                self._send(200, headers={"ETag": f'"{etag}"'})
+
+            def do_POST(self):
+                bucket, key, query = self._target()
+                body = self._body()
+                if "uploads" in query:
+                    upload_id = uuid.uuid4().hex
+                    with stub.lock:
+                        stub.uploads[upload_id] = {"bucket": bucket, "key": key, "parts": {}}
+                    xml = (f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><InitiateMultipartUploadResult><Bucket>{escape(bucket)}</Bucket>"
+                           f"<Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>").encode()
+                    return self._send(200, xml, "application/xml")
+                if "uploadId" in query:
+                    with stub.lock:
+                        upload = stub.uploads.pop(query["uploadId"])
+                        parts = [upload["parts"][n] for n in sorted(upload["parts"])]
+                        data = b"".join(p[0] for p in parts)
+                        etag = hashlib.md5(b"".join(bytes.fromhex(p[1]) for p in parts)).hexdigest() + f"-{len(parts)}"
+                        stub.objects(bucket)[key] = (data, etag, time.time())
+                    xml = (f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><CompleteMultipartUploadResult><Bucket>{escape(bucket)}</Bucket>"
+                           f"<Key>{escape(key)}</Key><ETag>\"{etag}\"</ETag></CompleteMultipartUploadResult>").encode()
+                    return self._send(200, xml, "application/xml")
+                if "delete" in query:
+                    keys = re.findall(rb"<Key>(.*?)</Key>", body)
+                    with stub.lock:
+                        for k in keys: stub.objects(bucket).pop(k.decode(), None)
+                    deleted = "".join(f"<Deleted><Key>{k.decode()}</Key></Deleted>" for k in keys)
+                    return self._send(200, f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><DeleteResult>{deleted}</DeleteResult>".encode(), "application/xml")
+                self._error(400, "InvalidRequest")
+
+            def do_GET(self):
+                bucket, key, query = self._target()
+                if not key:
+                    return self._list(bucket, query)
+                with stub.lock:
+                    obj = stub.objects(bucket).get(key)
+                if obj is None:
+                    return self._error(404, "NoSuchKey")
+                data, etag, mtime = obj
+                headers = {"ETag": f'"{etag}"', "Last-Modified": formatdate(mtime, usegmt=True), "Accept-Ranges": "bytes"}
+                byte_range = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+                if byte_range:
+                    start = int(byte_range.group(1))
+                    end = int(byte_range.group(2)) if byte_range.group(2) else len(data) - 1
+                    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+                    return self._send(206, data[start:end + 1], "application/octet-stream", headers)
+                self._send(200, data, "application/octet-stream", headers)
+
+            def do_HEAD(self):
+                bucket, key, _ = self._target()
+                with stub.lock:
+                    obj = stub.objects(bucket).get(key) if key else ()
+                if obj is None:
+                    return self._send(404)
+                if not key:
+                    return self._send(200)
+                data, etag, mtime = obj
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("ETag", f'"{etag}"')
+                self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+                self.end_headers()
+
+            def do_DELETE(self):
+                bucket, key, _ = self._target()
+                with stub.lock:
+                    stub.objects(bucket).pop(key, None)
+                self._send(204)
+
+            def _list(self, bucket, query):
+                prefix = query.get("prefix", "")
+                start_after = query.get("continuation-token") or query.get("start-after", "")
+                max_keys = int(query.get("max-keys", 1000))
+                with stub.lock:
+                    keys = sorted(k for k in stub.objects(bucket) if k.startswith(prefix) and k > start_after)
+                    page = [(k, stub.objects(bucket)[k]) for k in keys[:max_keys]]
+                truncated = len(keys) > max_keys
+                contents = "".join(
+                    f"<Contents><Key>{escape(k)}</Key><LastModified>{_iso(o[2])}</LastModified>"
+                    f"<ETag>&quot;{o[1]}&quot;</ETag><Size>{len(o[0])}</Size><StorageClass>STANDARD</StorageClass></Contents>"
+                    for k, o in page)
+                token = f"<NextContinuationToken>{escape(page[-1][0])}</NextContinuationToken>" if truncated else ""
+                xml = (f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><ListBucketResult xmlns=\"http://s3.amazonaws.com/doc/2006-03-01/\">"
+                       f"<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix><KeyCount>{len(page)}</KeyCount>"
+                       f"<MaxKeys>{max_keys}</MaxKeys><IsTruncated>{'true' if truncated else 'false'}</IsTruncated>{token}{contents}</ListBucketResult>").encode()
+                self._send(200, xml, "application/xml")
+
+        return Handler
+
+    @property
+    def url(self):
+        return self.server.url
+
+    def start(self):
+        self.server.start()
+        return self
+
+    def stop(self):
+        self.server.stop()
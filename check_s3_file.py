@@ -1,41 +1,15 @@
-import boto3
-from botocore.config import Config
+"""Crawl status and stored objects of one URL, from the state DB's manifest.
 
-S3_CONFIG = {
-    "endpoint_url": os.getenv("S3_ENDPOINT", "https://s3.us-west-1.wasabisys.com"),
-    "access_key": os.getenv("S3_ACCESS_KEY"),
-    "secret_key": os.getenv("S3_SECRET_KEY"),
-    "bucket": os.getenv("S3_BUCKET", "crawlai")
-}
+Equivalent to `crawlai manifest url <URL>`:
+    python check_s3_file.py https://forum.rclone.org/t/some-topic/12345 --download
+"""
+import sys
 
-def check_specific_file():
-    s3 = boto3.client(
-        's3',
-        endpoint_url=S3_CONFIG["endpoint_url"],
-        aws_access_key_id=S3_CONFIG["access_key"],
-        aws_secret_access_key=S3_CONFIG["secret_key"],
-        config=Config(signature_version='s3v4')
-    )
-    
-    bucket_name = S3_CONFIG["bucket"]
-    # Transforming the URL to the expected S3 filename format
-    # URL: https://forum.rclone.org/t/mounting-rclone-to-use-like-a-local-drive/25604/19
-    # Format used in script: url.replace("https://", "").replace("/", "_").replace(".", "_")
-    target_prefix = "extracted_data/forum_rclone_org_t_mounting-rclone-to-use-like-a-local-drive_25604_19"
-    
-    print(f"Searching for files starting with: {target_prefix}")
-    
-    try:
-        response = s3.list_objects_v2(Bucket=bucket_name, Prefix=target_prefix)
-        if 'Contents' in response:
-            print("\nFound Files on S3:")
-            for obj in response['Contents']:
-                print(f"  {obj['Key']} ({obj['Size'] / 1024:.2f} KB) - {obj['LastModified']}")
-        else:
-            print("\nNo files found for this specific URL yet.")
-            
-    except Exception as e:
-        print(f"Error checking S3: {e}")
+from crawlai.cli import main
+
+DEFAULT_URL = "https://forum.rclone.org/t/mounting-rclone-to-use-like-a-local-drive/25604/19"
 
 if __name__ == "__main__":
-    check_specific_file()
+    args = sys.argv[1:]
+    if not args or args[0].startswith("-"): args.insert(0, DEFAULT_URL)
+    main(["manifest", "url", *args])
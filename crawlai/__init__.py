@@ -0,0 +1,6 @@
+"""Rclone documentation/forum crawler.
+
+Importing the package is cheap: Crawl4AI, boto3, openai and litellm are only
+imported when the backend that needs them is selected (see crawlai.backends).
+"""
+__version__ = "0.2.0"
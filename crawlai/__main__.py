@@ -0,0 +1,3 @@
+from crawlai.cli import main
+
+main()
@@ -0,0 +1,189 @@
+"""WARC-like record/replay archive of fetched pages.
+
+Each capture is written as two gzip members appended to the current segment
+(`<prefix>-<timestamp>-<seq>.warc.gz`): a `resource` record with the raw HTML and a
+`conversion` record with Crawl4AI's Markdown. Because every record is its own
+gzip member, a record can be read back by seeking to its offset and
+decompressing `length` bytes, and the segments stay readable by WARC tools.
+The SQLite index (`index.db`) maps each URL to its latest capture.
+"""
+import gzip
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime, timezone
+
+from crawlai.fetch import FetchResult
+
+INDEX_NAME = "index.db"
+
+
+def build_record(record_type, url, content_type, payload, extra_headers=None):
+    headers = [
+        "WARC/1.1",
+        f"WARC-Type: {record_type}",
+        f"WARC-Target-URI: {url}",
+        f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}",
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(payload)}",
+    ]
+    headers += [f"{k}: {v}" for k, v in (extra_headers or {}).items()]
+    return ("\r\n".join(headers) + "\r\n\r\n").encode("utf-8") + payload + b"\r\n\r\n"
+
+
+def parse_record(data):
+    """(headers dict, payload bytes) from one decompressed record."""
+    head, _, rest = data.partition(b"\r\n\r\n")
+    headers = {}
+    for line in head.decode("utf-8").split("\r\n")[1:]:
+        key, _, value = line.partition(":")
+        headers[key.strip()] = value.strip()
+    return headers, rest[:int(headers["Content-Length"])]
+
+
+class FetchArchive:
+    """Append captures to rolling segments under `directory` and index them."""
+
+    def __init__(self, directory, max_segment_bytes=256 * 1024 * 1024, prefix="crawl"):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.prefix = prefix
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self.conn = sqlite3.connect(self.index_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS captures (
+                url TEXT PRIMARY KEY,
+                segment TEXT,
+                html_offset INTEGER,
+                html_length INTEGER,
+                md_offset INTEGER,
+                md_length INTEGER,
+                status_code INTEGER,
+                fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.conn.commit()
+        self.segment = None
+        self.segment_name = None
+        self.sequence = 0
+        # Segments of this run not uploaded yet (the open one included); the uploaded
+        # index must not point at them
+        self.unpublished = set()
+
+    def _open_segment(self):
+        self.sequence += 1
+        self.segment_name = f"{self.prefix}-{time.strftime('%Y%m%d%H%M%S')}-{self.sequence:05d}.warc.gz"
+        self.unpublished.add(self.segment_name)
+        self.segment = open(os.path.join(self.directory, self.segment_name), "ab")
+
+    def roll(self):
+        """Close the current segment and return its path (None if nothing was open)."""
+        if not self.segment: return None
+        path = self.segment.name
+        self.segment.close()
+        self.segment, self.segment_name = None, None
+        return path
+
+    def _append(self, record):
+        offset = self.segment.tell()
+        self.segment.write(gzip.compress(record, compresslevel=6))
+        return offset, self.segment.tell() - offset
+
+    def write(self, result):
+        """Archive a successful FetchResult; returns the path of a segment that just rolled over, if any."""
+        if not self.segment: self._open_segment()
+        html = (result.html or "").encode("utf-8")
+        status = {"WARC-Crawlai-Status": result.status_code} if result.status_code else None
+        html_offset, html_length = self._append(build_record("resource", result.url, "text/html; charset=utf-8", html, status))
+        md_offset, md_length = self._append(build_record("conversion", result.url, "text/markdown; charset=utf-8", (result.markdown or "").encode("utf-8")))
+        self.segment.flush()
+        self.conn.execute("INSERT OR REPLACE INTO captures (url, segment, html_offset, html_length, md_offset, md_length, status_code) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          (result.url, self.segment_name, html_offset, html_length, md_offset, md_length, result.status_code))
+        self.conn.commit()
+        if self.segment.tell() >= self.max_segment_bytes:
+            return self.roll()
+        return None
+
+    def _read(self, segment, offset, length):
+        with open(os.path.join(self.directory, segment), "rb") as f:
+            f.seek(offset)
+            return parse_record(gzip.decompress(f.read(length)))[1].decode("utf-8")
+
+    def read(self, url):
+        """FetchResult rebuilt from the latest capture of `url`, or None."""
+        row = self.conn.execute("SELECT segment, html_offset, html_length, md_offset, md_length, status_code FROM captures WHERE url = ?", (url,)).fetchone()
+        if not row: return None
+        segment, html_offset, html_length, md_offset, md_length, status_code = row
+        return FetchResult(url, True, self._read(segment, html_offset, html_length), self._read(segment, md_offset, md_length), status_code, None)
+
+    def urls(self):
+        return [row[0] for row in self.conn.execute("SELECT url FROM captures")]
+
+    def snapshot_index(self, target_path, published_only=False):
+        """Copy of the index; with published_only, without captures in unpublished segments."""
+        with closing(sqlite3.connect(target_path)) as dst:
+            self.conn.backup(dst)
+            if published_only and self.unpublished:
+                dst.executemany("DELETE FROM captures WHERE segment = ?", ((name,) for name in self.unpublished))
+                dst.commit()
+        return target_path
+
+    def close(self):
+        self.roll()
+        self.conn.close()
+
+
+async def upload_archive_files(store, archive, segment_path, prefix):
+    """Upload a closed segment, then an index snapshot of the segments uploaded so far."""
+    if segment_path:
+        name = os.path.basename(segment_path)
+        if await store.upload_file(segment_path, f"{prefix}/{name}"):
+            archive.unpublished.discard(name)
+    snapshot = archive.snapshot_index(archive.index_path + ".sync", published_only=True)
+    await store.upload_file(snapshot, f"{prefix}/{INDEX_NAME}")
+    os.remove(snapshot)
+
+
+def pull_archive(store, prefix, directory):
+    """Download every archive object under `prefix/` that is missing locally."""
+    os.makedirs(directory, exist_ok=True)
+    pulled = 0
+    for obj in store.list_objects(prefix + "/"):
+        name = obj["Key"][len(prefix) + 1:]
+        target = os.path.join(directory, name)
+        # The index always changes; segments are immutable once uploaded
+        if name != INDEX_NAME and os.path.exists(target) and os.path.getsize(target) == obj["Size"]:
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        store.download_file(obj["Key"], target)
+        pulled += 1
+    return pulled
+
+
+def merge_node_indexes(directory):
+    """Add the captures of cluster nodes (`<node>/index.db`) to the top-level index.
+
+    Segment paths become `<node>/<segment>`, so a replay of `directory` reads them
+    in place. The most recent capture of a URL wins. Returns the number of nodes.
+    """
+    nodes = sorted(name for name in os.listdir(directory) if os.path.isfile(os.path.join(directory, name, INDEX_NAME)))
+    if not nodes: return 0
+    archive = FetchArchive(directory)
+    try:
+        for node in nodes:
+            archive.conn.execute("ATTACH DATABASE ? AS node", (os.path.join(directory, node, INDEX_NAME),))
+            archive.conn.execute("""
+                INSERT OR REPLACE INTO captures
+                SELECT url, ? || '/' || segment, html_offset, html_length, md_offset, md_length, status_code, fetched_at
+                FROM node.captures n
+                WHERE NOT EXISTS (SELECT 1 FROM main.captures c WHERE c.url = n.url AND c.fetched_at > n.fetched_at)
+            """, (node,))
+            archive.conn.commit()
+            archive.conn.execute("DETACH DATABASE node")
+    finally:
+        archive.close()
+    return len(nodes)
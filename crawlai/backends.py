@@ -0,0 +1,33 @@
+"""Registry of pluggable stages.
+
+Backends are referenced by dotted path and only imported when selected, so a
+crawl that stores locally never imports boto3 and a NVIDIA crawl never imports
+litellm.
+"""
+import importlib
+
+BACKENDS = {
+    "fetcher": {
+        "crawl4ai": "crawlai.fetch:Crawl4AIFetcher",
+        "replay": "crawlai.fetch:ReplayFetcher",
+    },
+    "extractor": {
+        "nvidia": "crawlai.extract:NvidiaExtractor",
+        "gemini": "crawlai.extract:GeminiExtractor",
+    },
+    "store": {
+        "s3": "crawlai.storage:S3Store",
+        "local": "crawlai.storage:LocalStore",
+    },
+}
+
+
+def load_backend(kind, name):
+    """Return the class registered for `kind`/`name`, importing its module on demand."""
+    try:
+        target = BACKENDS[kind][name]
+    except KeyError:
+        choices = ", ".join(BACKENDS.get(kind, {}))
+        raise ValueError(f"Unknown {kind} backend {name!r} (choose from {choices})") from None
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
@@ -0,0 +1,154 @@
+"""Command line entry point (`crawlai`, or `python -m crawlai`)."""
+import argparse
+import asyncio
+import os
+import time
+
+from crawlai.backends import BACKENDS
+from crawlai.config import DEFAULT_PROFILE, PROFILES, build_config
+
+
+def add_crawl_parser(subparsers):
+    parser = subparsers.add_parser("crawl", help="crawl rclone.org and the forum")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=sorted(PROFILES), help=f"backend/settings preset (default {DEFAULT_PROFILE})")
+    parser.add_argument("--fetcher", choices=sorted(BACKENDS["fetcher"]), help="override the profile's fetch backend")
+    parser.add_argument("--extractor", choices=sorted(BACKENDS["extractor"]), help="override the profile's extract backend")
+    parser.add_argument("--store", choices=sorted(BACKENDS["store"]), help="override the profile's store backend")
+    parser.add_argument("--schema", dest="extract_schema", choices=["compact", "full"], help="extraction JSON schema (default compact)")
+    parser.add_argument("--db", dest="db_path", help="state DB path")
+    parser.add_argument("--start-url", help="URL queued before the crawl starts")
+    parser.add_argument("--workers", type=int, help="concurrent pages in flight (default 1)")
+    parser.add_argument("--output-dir", help="root directory for the local store")
+    parser.add_argument("--no-sitemaps", action="store_true", help="skip sitemap seeding")
+    parser.add_argument("--shards", dest="cluster_shards", type=int, help="crawl as one node of a cluster with this many URL shards")
+    parser.add_argument("--node-id", help="this node's name in the cluster (default: hostname + random suffix)")
+    parser.add_argument("--retry-failed", action="store_true", help="re-queue URLs that previously failed for good")
+    parser.add_argument("--archive-dir", help="record fetched pages here (or replay from it with --fetcher replay)")
+    parser.add_argument("--archive-upload", action="store_true", help="upload closed archive segments and the index to the store")
+    parser.set_defaults(func=run_crawl)
+
+
+def add_archive_parser(subparsers):
+    parser = subparsers.add_parser("archive", help="manage the fetch archive")
+    actions = parser.add_subparsers(dest="action", required=True)
+    pull = actions.add_parser("pull", help="download an uploaded archive for replay")
+    pull.add_argument("--profile", default=DEFAULT_PROFILE, choices=sorted(PROFILES))
+    pull.add_argument("--archive-dir", required=True, help="local directory to download into")
+    pull.set_defaults(func=run_archive_pull)
+
+
+def add_reextract_parser(subparsers):
+    parser = subparsers.add_parser("reextract", help="regenerate extraction JSON from stored Markdown")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=sorted(PROFILES))
+    parser.add_argument("--extractor", choices=sorted(BACKENDS["extractor"]), help="override the profile's extract backend")
+    parser.add_argument("--store", choices=sorted(BACKENDS["store"]), help="override the profile's store backend")
+    parser.add_argument("--schema", dest="extract_schema", choices=["compact", "full"], help="extraction JSON schema (default compact)")
+    parser.add_argument("--db", dest="db_path", help="crawl state DB used to map objects back to URLs")
+    parser.add_argument("--output-dir", help="root directory for the local store")
+    parser.add_argument("--checkpoint", default="reextract_state.db", help="progress DB (synced to the store)")
+    parser.add_argument("--get-concurrency", type=int, default=16, help="parallel Markdown downloads (default 16)")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="parallel LLM calls (default 4)")
+    parser.add_argument("--llm-rpm", type=int, help="LLM requests per minute (default 39)")
+    parser.add_argument("--limit", type=int, help="stop after queueing this many objects")
+    parser.add_argument("--force", action="store_true", help="re-extract even if the checkpoint says the output is current")
+    parser.set_defaults(func=run_reextract)
+
+
+def add_manifest_parser(subparsers):
+    parser = subparsers.add_parser("manifest", help="query the state DB's index of stored objects")
+    actions = parser.add_subparsers(dest="action", required=True)
+    recent = actions.add_parser("recent", help="most recently stored objects")
+    recent.add_argument("--limit", type=int, default=50)
+    url = actions.add_parser("url", help="crawl status and stored objects of one page")
+    url.add_argument("url")
+    reconcile = actions.add_parser("reconcile", help="compare the manifest with the bucket, one slice at a time")
+    reconcile.add_argument("--full", action="store_true", help="walk the whole bucket instead of a single slice")
+    reconcile.add_argument("--batch", type=int, default=1000, help="keys listed per slice (default 1000)")
+    for action in (recent, url, reconcile):
+        action.add_argument("--profile", default=DEFAULT_PROFILE, choices=sorted(PROFILES))
+        action.add_argument("--store", choices=sorted(BACKENDS["store"]), help="override the profile's store backend")
+        action.add_argument("--db", dest="db_path", help="state DB path")
+        action.add_argument("--output-dir", help="root directory for the local store")
+        action.add_argument("--download", action="store_true", help="refresh the state DB from the store first")
+        action.set_defaults(func=run_manifest)
+
+
+def run_crawl(args):
+    from crawlai.pipeline import crawl
+
+    overrides = {k: getattr(args, k) for k in ("fetcher", "extractor", "store", "extract_schema", "db_path", "start_url", "workers", "output_dir", "archive_dir", "cluster_shards", "node_id")}
+    if args.no_sitemaps: overrides["sitemap_urls"] = []
+    if args.archive_upload: overrides["archive_upload"] = True
+    if args.retry_failed: overrides["retry_failed"] = True
+    asyncio.run(crawl(build_config(args.profile, **overrides)))
+
+
+def run_reextract(args):
+    from crawlai.reextract import reextract
+
+    config = build_config(args.profile, **{k: getattr(args, k) for k in ("extractor", "store", "extract_schema", "db_path", "output_dir", "llm_rpm")})
+    asyncio.run(reextract(config, checkpoint_path=args.checkpoint, get_concurrency=args.get_concurrency,
+                          llm_concurrency=args.llm_concurrency, limit=args.limit, force=args.force))
+
+
+def run_manifest(args):
+    from crawlai.backends import load_backend
+    from crawlai.manifest import print_summary, print_uploads, reconcile_step
+    from crawlai.state import StateManager
+
+    config = build_config(args.profile, **{k: getattr(args, k) for k in ("store", "db_path", "output_dir")})
+    store = load_backend("store", config["store"])(config)
+    try:
+        if args.download or not os.path.exists(config["db_path"]):
+            store.download_file(config["state_key"], config["db_path"])
+        state = StateManager(config["db_path"])
+        if args.action == "recent":
+            print_uploads(state.recent_uploads(args.limit))
+            print_summary(state)
+        elif args.action == "url":
+            row = state.url_status(args.url)
+            if row: print(f"URL: {args.url}\nStatus: {row[0]} (attempts {row[1]}, last error {row[2] or '-'})\nLast Updated: {row[3]}")
+            else: print(f"URL not found in database: {args.url}")
+            rows = state.uploads_for_url(args.url)
+            if rows: print_uploads(rows)
+            else: print("No stored objects recorded for this URL.")
+        else:
+            while True:
+                t_step = time.time()
+                counts, finished = reconcile_step(state, store, args.batch)
+                print(f"  [RECONCILE] +{counts['added']} added, {counts['changed']} changed, {counts['missing']} missing ({time.time()-t_step:.1f}s)")
+                if finished or not args.full: break
+            print_summary(state)
+    finally:
+        store.close()
+
+
+def run_archive_pull(args):
+    from crawlai.archive import INDEX_NAME, merge_node_indexes, pull_archive
+    from crawlai.backends import load_backend
+
+    config = build_config(args.profile, archive_dir=args.archive_dir)
+    store = load_backend("store", config["store"])(config)
+    try:
+        pulled = pull_archive(store, config["archive_prefix"], config["archive_dir"])
+        print(f"[ARCHIVE] {pulled} objects downloaded to {config['archive_dir']}")
+    finally:
+        store.close()
+    # Cluster nodes upload under <archive_prefix>/<node_id>/; replay reads one index
+    merged = merge_node_indexes(config["archive_dir"])
+    if merged: print(f"[ARCHIVE] Merged the indexes of {merged} cluster nodes into {os.path.join(config['archive_dir'], INDEX_NAME)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="crawlai", description="Crawl rclone docs and forum into JSON/Markdown with an LLM.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_crawl_parser(subparsers)
+    add_archive_parser(subparsers)
+    add_reextract_parser(subparsers)
+    add_manifest_parser(subparsers)
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Multi-node crawling: shard the URL space and coordinate the nodes through S3.
+
+Every node runs the normal pipeline against its own state DB, which only holds
+URLs of the shards the node currently owns. Keys under config['cluster_prefix']:
+
+    meta.json                     shard count, fixed when the cluster is created
+    seeded.json                   which node last seeded the frontier from sitemaps
+    nodes/<node>.json             heartbeats, used to compute each node's fair share
+    leases/shard-NNNN.json        owner, expiry and where the shard's rows live
+    inbox/shard-NNNN/<batch>.tsv  links discovered for a shard by any node
+    handoff/shard-NNNN.db         rows of a shard released by its last owner
+    state/<node>.db               each node's state DB
+
+Leases, meta.json and seeded.json are only written with conditional PUTs
+(If-None-Match / If-Match on the ETag that was read), so two nodes can never
+both own a shard. A node that dies just stops renewing; whoever takes the shard
+over imports its rows from the dead node's last state upload.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+
+def shard_of(url, shards):
+    """Stable shard number for a URL, from its host and path."""
+    parsed = urlparse(url)
+    digest = hashlib.sha1(f"{parsed.hostname}{parsed.path}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shards
+
+
+class Cluster:
+    """This node's view of the cluster: owned shards, outgoing links, leases.
+
+    add_urls / add_urls_bulk / claim_pending_url stand in for the StateManager
+    methods of the same name: links for owned shards go to the local state DB,
+    the rest are batched for the owning shard's inbox, and URLs of a shard being
+    released are not claimed. `lock` guards `owned`, `releasing` and the outbox
+    (and a routed insert or a claim against them); shard rows are copied
+    outside of it. The blocking methods are run on an executor.
+    """
+
+    def __init__(self, config, store, state):
+        if not hasattr(store, "put_object"):
+            raise ValueError(f"Cluster mode needs a store with conditional writes (not {config['store']!r})")
+        self.config = config
+        self.store = store
+        self.state = state
+        self.shards = config["cluster_shards"]
+        self.node_id = config["node_id"]
+        self.lease_seconds = config["cluster_lease_seconds"]
+        self.owned = {}  # shard -> ETag of our lease object
+        self.releasing = set()  # shards whose rows are being handed off
+        self.outbox = defaultdict(list)  # shard -> [(url, depth, priority)]
+        self.lock = threading.Lock()
+        self.batch_ids = itertools.count()
+        self.last_activity = time.time()
+
+    def key(self, *parts):
+        return "/".join((self.config["cluster_prefix"],) + parts)
+
+    def shard_key(self, kind, shard, ext):
+        return self.key(kind, f"shard-{shard:04d}{ext}")
+
+    def in_shard(self, shard):
+        return lambda url: shard_of(url, self.shards) == shard
+
+    # Frontier routing
+
+    def add_urls(self, urls, depth=0):
+        self.add_urls_bulk([(url, depth, 0) for url in urls])
+
+    def add_urls_bulk(self, rows):
+        local, queued = [], 0
+        # Held until the rows are in the DB, so a release can't export the shard in between
+        with self.lock:
+            for row in rows:
+                shard = shard_of(row[0], self.shards)
+                if shard in self.owned:
+                    local.append(row)
+                else:
+                    self.outbox[shard].append(row)
+                    queued += 1
+            return (self.state.add_urls_bulk(local) if local else 0) + queued
+
+    def claim_pending_url(self):
+        with self.lock:
+            releasing = set(self.releasing)
+            skip = (lambda url: shard_of(url, self.shards) in releasing) if releasing else None
+            return self.state.claim_pending_url(skip)
+
+    def flush_outbox(self):
+        """Write buffered links for other shards as inbox batches."""
+        with self.lock:
+            outbox, self.outbox = self.outbox, defaultdict(list)
+        batch_size = self.config["cluster_inbox_batch"]
+        for shard, rows in outbox.items():
+            for i in range(0, len(rows), batch_size):
+                body = "\n".join(f"{depth}\t{priority}\t{url}" for url, depth, priority in rows[i:i + batch_size])
+                name = f"{self.node_id}-{int(time.time() * 1000)}-{next(self.batch_ids)}.tsv"
+                self.store.put_object(self.key("inbox", f"shard-{shard:04d}", name), body)
+
+    def read_inbox(self):
+        """Add inbox batches of owned shards to the state DB; returns the keys read.
+
+        The caller deletes them only after the next state sync, so a crash in
+        between re-reads a batch instead of losing it.
+        """
+        keys = []
+        for shard in list(self.owned):
+            for obj in self.store.list_objects(self.key("inbox", f"shard-{shard:04d}") + "/"):
+                rows = []
+                for line in self.store.get_text(obj["Key"]).splitlines():
+                    depth, priority, url = line.split("\t", 2)
+                    rows.append((url, int(depth), int(priority)))
+                self.state.add_urls_bulk(rows)
+                keys.append(obj["Key"])
+        if keys: self.last_activity = time.time()
+        return keys
+
+    def delete_keys(self, keys):
+        for key in keys: self.store.delete(key)
+
+    # Leases
+
+    def read_lease(self, shard):
+        text, etag = self.store.get_versioned(self.shard_key("leases", shard, ".json"))
+        return (json.loads(text) if text else None), etag
+
+    def write_lease(self, shard, etag, expires, state_key):
+        body = json.dumps({"node": self.node_id, "expires": expires, "state_key": state_key})
+        return self.store.put_object(self.shard_key("leases", shard, ".json"), body, if_match=etag, if_none_match=not etag)
+
+    def try_acquire(self, shard, now, downloaded):
+        """Take a free or expired shard; `downloaded` caches state DBs fetched during this balance."""
+        lease, etag = self.read_lease(shard)
+        if lease and lease["node"] != self.node_id and lease["expires"] > now: return False
+        new_etag = self.write_lease(shard, etag, now + self.lease_seconds, self.config["state_key"])
+        if not new_etag: return False
+        self.last_activity = time.time()
+        # Rows live in the previous owner's state DB (or in a handoff after a clean release)
+        state_key = lease and lease.get("state_key")
+        if state_key and state_key != self.config["state_key"] and state_key not in downloaded:
+            path = f"{self.config['db_path']}.import{len(downloaded)}"
+            downloaded[state_key] = path if self.store.download_file(state_key, path) else None
+        if state_key and downloaded.get(state_key):
+            imported = self.state.import_urls(downloaded[state_key], self.in_shard(shard))
+            print(f"  [CLUSTER] Shard {shard}: imported {imported} URLs from {lease['node']}")
+        with self.lock: self.owned[shard] = new_etag
+        print(f"  [CLUSTER] Acquired shard {shard} ({len(self.owned)} owned)")
+        return True
+
+    def release(self, shard, wait_until=None):
+        """Hand a shard back: forget its rows, upload them and expire the lease.
+
+        New claims skip the shard first. Pages already being processed get until
+        `wait_until` to finish, so their results go into the handoff instead of
+        being fetched again by the next owner.
+        """
+        in_shard = self.in_shard(shard)
+        with self.lock: self.releasing.add(shard)
+        try:
+            while wait_until and self.state.processing_count(in_shard) and time.time() < wait_until:
+                time.sleep(1)
+            path = self.config["db_path"] + ".handoff"
+            handoff_key = self.shard_key("handoff", shard, ".db")
+            # Once it is not owned, new links for the shard go to the outbox, so the
+            # rows can be copied without holding up the workers
+            with self.lock: etag = self.owned.pop(shard)
+            self.state.export_urls(path, in_shard)
+            self.state.drop_urls(in_shard)
+            try:
+                with open(path, "rb") as f: self.store.put_object(handoff_key, f.read())
+                self.write_lease(shard, etag, 0, handoff_key)
+            except Exception:
+                # Keep the shard; the next balance retries the release
+                self.state.import_urls(path, in_shard)
+                with self.lock: self.owned[shard] = etag
+                raise
+            finally:
+                os.remove(path)
+        finally:
+            with self.lock: self.releasing.discard(shard)
+        print(f"  [CLUSTER] Released shard {shard}")
+
+    def renew(self, now):
+        for shard, etag in list(self.owned.items()):
+            new_etag = self.write_lease(shard, etag, now + self.lease_seconds, self.config["state_key"])
+            if new_etag:
+                self.owned[shard] = new_etag
+            else:
+                # Our lease expired and another node took the shard (and imported its rows)
+                with self.lock:
+                    del self.owned[shard]
+                    self.releasing.add(shard)
+                self.state.drop_urls(self.in_shard(shard))
+                with self.lock: self.releasing.discard(shard)
+                print(f"  [CLUSTER] Lost shard {shard}")
+
+    def live_nodes(self, now):
+        """Nodes whose heartbeat is younger than a lease."""
+        nodes = {self.node_id}
+        for obj in self.store.list_objects(self.key("nodes") + "/"):
+            if obj["LastModified"].timestamp() > now - self.lease_seconds:
+                nodes.add(os.path.basename(obj["Key"])[:-len(".json")])
+        return nodes
+
+    def balance(self, now):
+        """Own ceil(shards / live nodes) shards: release the surplus, take free or expired ones."""
+        target = -(-self.shards // len(self.live_nodes(now)))
+        # One wait budget for all releases: the other leases were renewed just
+        # before and must not run out while busy shards drain
+        wait_until = time.time() + self.lease_seconds / 2
+        for shard in sorted(self.owned)[target:]:
+            if shard not in self.owned: continue  # lost in the renewal below
+            self.release(shard, wait_until)
+            # Copying a large shard takes a while too
+            self.renew(time.time())
+        # Start at a node-specific offset so nodes joining together don't fight over shard 0
+        start = shard_of(self.node_id, self.shards)
+        downloaded = {}
+        try:
+            for i in range(self.shards):
+                if len(self.owned) >= target: break
+                shard = (start + i) % self.shards
+                if shard not in self.owned: self.try_acquire(shard, now, downloaded)
+        finally:
+            for path in filter(None, downloaded.values()): os.remove(path)
+
+    def heartbeat(self, now):
+        self.store.put_object(self.key("nodes", f"{self.node_id}.json"), json.dumps({"at": now}))
+
+    # Lifecycle
+
+    def ensure_meta(self):
+        text, _ = self.store.get_versioned(self.key("meta.json"))
+        if text is None:
+            if self.store.put_object(self.key("meta.json"), json.dumps({"shards": self.shards}), if_none_match=True):
+                return
+            text, _ = self.store.get_versioned(self.key("meta.json"))
+        shards = json.loads(text)["shards"]
+        if shards != self.shards:
+            raise ValueError(f"Cluster {self.config['cluster_prefix']!r} was created with {shards} shards, not {self.shards}")
+
+    def should_seed(self):
+        """True for exactly one node per reseed interval."""
+        now = time.time()
+        text, etag = self.store.get_versioned(self.key("seeded.json"))
+        if text and now - json.loads(text)["at"] < self.config["cluster_reseed_hours"] * 3600: return False
+        body = json.dumps({"node": self.node_id, "at": now})
+        return self.store.put_object(self.key("seeded.json"), body, if_match=etag, if_none_match=not etag) is not None
+
+    def tick(self):
+        now = time.time()
+        self.heartbeat(now)
+        self.renew(now)
+        self.balance(now)
+        self.flush_outbox()
+
+    def start(self):
+        print(f"[INIT] Joining cluster {self.config['cluster_prefix']!r} as {self.node_id} ({self.shards} shards)")
+        self.ensure_meta()
+        self.tick()
+
+    def stop(self):
+        self.flush_outbox()
+        # Workers have stopped; rows they left 'processing' come back as pending on import
+        for shard in list(self.owned): self.release(shard)
+        self.store.delete(self.key("nodes", f"{self.node_id}.json"))
+
+    def quiet(self):
+        """No new work from the cluster for cluster_idle_seconds."""
+        return not self.outbox and time.time() - self.last_activity > self.config["cluster_idle_seconds"]
+
+    async def maintain(self, sync_state):
+        """Renew leases, rebalance and exchange links every cluster_tick seconds."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.config["cluster_tick"])
+            try:
+                await loop.run_in_executor(None, self.tick)
+                keys = await loop.run_in_executor(None, self.read_inbox)
+                if keys:
+                    await sync_state()
+                    await loop.run_in_executor(None, self.delete_keys, keys)
+            except Exception as e:
+                print(f"  [CLUSTER ERR] {e}")
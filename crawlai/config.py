@@ -0,0 +1,158 @@
+"""Crawl configuration: shared constants, environment settings and profiles.
+
+A config is a plain dict. `build_config(profile, **overrides)` starts from
+DEFAULTS, applies the profile and then any overrides (CLI flags, benchmarks).
+Environment variables are read when the config is built, not at import time,
+so Colab users can set them after importing the package.
+"""
+import os
+import socket
+import uuid
+
+START_URL = "https://rclone.org/"
+ALLOWED_DOMAINS = ["rclone.org", "forum.rclone.org"]
+BLACKLIST_PATTERNS = ["/fix-", "/integration-tests/", "/v1.", "/v1_", "beta.rclone.org", "pub.rclone.org", "downloads.rclone.org"]
+EXCLUDED_EXTENSIONS = ('.txt', '.bin', '.exe', '.zip', '.tar.gz', '.rpm', '.deb', '.iso', '.img', '.dmg', '.pkg', '.msi', '.pdf', '.png', '.jpg', '.jpeg', '.gif', '.svg')
+SITEMAP_URLS = ["https://rclone.org/sitemap.xml", "https://forum.rclone.org/sitemap.xml"]
+OUTPUT_PREFIX = "extracted_data"
+
+
+def env_list(name, default):
+    value = os.getenv(name)
+    if value is None: return list(default)
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def s3_settings():
+    return {
+        "endpoint_url": os.getenv("S3_ENDPOINT", "https://s3.us-west-1.wasabisys.com"),
+        "access_key": os.getenv("S3_ACCESS_KEY"),
+        "secret_key": os.getenv("S3_SECRET_KEY"),
+        "bucket": os.getenv("S3_BUCKET", "crawlai"),
+    }
+
+
+def nvidia_settings():
+    return {
+        "api_key": os.getenv("NVIDIA_API_KEY"),
+        "base_url": os.getenv("NVIDIA_BASE_URL", "https://integrate.api.nvidia.com/v1"),
+        "model": os.getenv("NVIDIA_MODEL", "stepfun-ai/step-3.5-flash"),
+    }
+
+
+def gemini_settings(model):
+    return {
+        "api_key": os.getenv("GEMINI_API_KEY"),
+        "model": os.getenv("GEMINI_MODEL", model),
+    }
+
+
+DEFAULTS = {
+    "start_url": START_URL,
+    "allowed_domains": ALLOWED_DOMAINS,
+    "db_path": "crawl_state_updated.db",
+    # S3 key the state DB is synced to (defaults to the DB file name)
+    "state_key": None,
+    "sync_every": 5,
+    "workers": 1,
+    # Retries: failed URLs are re-queued with exponential backoff (seconds) until
+    # retry_max_attempts; claimed URLs not finished within lease_seconds are re-queued
+    "retry_max_attempts": 5,
+    "retry_base_delay": 60,
+    "retry_max_delay": 3600,
+    "lease_seconds": 900,
+    # Give URLs already marked 'failed' a fresh set of attempts on startup
+    "retry_failed": False,
+    # Cluster mode (0 = single node): URLs are split into this many shards, owned
+    # by nodes through lease objects under cluster_prefix in the S3 bucket
+    "cluster_shards": 0,
+    "node_id": None,
+    "cluster_prefix": "cluster",
+    "cluster_lease_seconds": 120,
+    "cluster_tick": 15,
+    "cluster_inbox_batch": 5000,
+    # A node stops after this long with nothing to crawl and no new links from the cluster
+    "cluster_idle_seconds": 300,
+    "cluster_reseed_hours": 24,
+    # Backends, resolved lazily through crawlai.backends
+    "fetcher": "crawl4ai",
+    "extractor": "nvidia",
+    "store": "s3",
+    # Fetch stage
+    "headless": True,
+    "wait_until": "domcontentloaded",
+    "page_timeout": 35000,
+    "word_count_threshold": 5,
+    "fetch_attempts": 2,
+    # Lean fetch: requests of these Playwright resource types, to block_hosts or (with
+    # block_third_party) outside allowed_domains are aborted in the browser. The page
+    # document itself is never blocked; the markup is all the parse stage uses.
+    "block_resources": True,
+    "block_resource_types": ["image", "media", "font", "stylesheet", "manifest", "texttrack", "eventsource"],
+    "block_third_party": True,
+    "block_hosts": ["google-analytics.com", "googletagmanager.com", "doubleclick.net", "gravatar.com"],
+    # Chromium features a headless crawl doesn't need (background networking, sync, extensions...)
+    "browser_light_mode": True,
+    "browser_extra_args": ["--disable-gpu", "--mute-audio", "--disable-dev-shm-usage", "--disable-notifications"],
+    # Longer HTML / Markdown is truncated right after the fetch, before any parsing
+    "max_page_chars": 2_000_000,
+    # Memory watchdog: above this RSS (crawler + Chromium) concurrency is lowered and
+    # then the browser recycled; 0 disables it. RSS is read from /proc (Linux only).
+    "memory_limit_mb": 6144,
+    "memory_check_seconds": 2,
+    # Fetch archive: record successful fetches here (or replay from it with fetcher="replay")
+    "archive_dir": None,
+    "archive_upload": False,
+    "archive_prefix": "fetch_archive",
+    "archive_segment_mb": 256,
+    # Extract stage
+    "llm_rpm": 39,
+    "max_prompt_chars": 12000,
+    # "compact": the model returns only what it adds (title, summary, code snippets,
+    # category) and the JSON points at the stored Markdown; "full": the model also
+    # rewrites the page as Markdown inside the JSON
+    "extract_schema": "compact",
+    # Output token budget per page type (extract.page_type); None = provider default
+    "llm_max_tokens": {"docs": 1024, "forum": 768, "other": 768},
+    # Let reasoning models think before answering (slower, far more output tokens)
+    "llm_reasoning": False,
+    # Store stage (local backend writes under this directory)
+    "output_dir": ".",
+    # boto3 connection pool; callers running more S3 threads than this raise it
+    "s3_max_pool_connections": 10,
+    # Every reconcile_every stored pages, compare the next reconcile_batch output
+    # keys in the bucket with the manifest table (0 disables it)
+    "reconcile_every": 200,
+    "reconcile_batch": 1000,
+}
+
+PROFILES = {
+    # Desktop run: Gemini extraction, files written to ./extracted_data, no cloud sync
+    "local": {"extractor": "gemini", "gemini_model": "gemini/gemini-2.5-flash-lite", "store": "local", "db_path": "crawl_state.db"},
+    # Colab with Gemini, results and state in Wasabi
+    "gemini-colab": {"extractor": "gemini", "gemini_model": "gemini/gemini-2.0-flash-exp", "store": "s3", "db_path": "crawl_state.db"},
+    # Colab with NVIDIA (OpenAI-compatible) extraction, results and state in Wasabi
+    "nvidia-colab": {"extractor": "nvidia", "store": "s3", "db_path": "crawl_state_updated.db"},
+}
+DEFAULT_PROFILE = "nvidia-colab"
+
+
+def build_config(profile=DEFAULT_PROFILE, **overrides):
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile {profile!r} (choose from {', '.join(PROFILES)})")
+    config = dict(DEFAULTS)
+    config.update(PROFILES[profile])
+    config["profile"] = profile
+    config["sitemap_urls"] = env_list("SITEMAP_URLS", SITEMAP_URLS)
+    config["s3"] = s3_settings()
+    config["nvidia"] = nvidia_settings()
+    config["gemini"] = gemini_settings(config.pop("gemini_model", "gemini/gemini-2.5-flash-lite"))
+    config.update({k: v for k, v in overrides.items() if v is not None})
+    if config["cluster_shards"]:
+        # Each node has its own state DB and archive in the bucket
+        config["node_id"] = config["node_id"] or f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        config["state_key"] = config["state_key"] or f"{config['cluster_prefix']}/state/{config['node_id']}.db"
+        config["archive_prefix"] = f"{config['archive_prefix']}/{config['node_id']}"
+    if not config["state_key"]:
+        config["state_key"] = os.path.basename(config["db_path"])
+    return config
@@ -0,0 +1,213 @@
+"""Extract stage backends (LLM clients are imported on construction)."""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from urllib.parse import urlparse
+
+from crawlai.parsing import clean_llm_json
+from crawlai.storage import output_key
+
+# Asks reasoning models behind NVIDIA's OpenAI-compatible endpoint to skip the thinking
+# phase. Chat templates name the switch differently and ignore variables they don't use;
+# max_tokens caps whatever reasoning a model emits regardless.
+NVIDIA_NO_REASONING = {"chat_template_kwargs": {"thinking": False, "enable_thinking": False}}
+CATEGORIES = ("documentation", "changelog", "forum-question", "forum-howto", "forum-bug", "other")
+
+
+class OutputTruncated(Exception):
+    """The model hit max_tokens even with a doubled budget; retrying won't help."""
+
+
+class RateLimiter:
+    """Space calls at least 60/rpm seconds apart across all workers."""
+
+    def __init__(self, rpm):
+        self.min_interval = 60.0 / rpm if rpm else 0.0
+        self.last_call = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            elapsed = time.time() - self.last_call
+            if elapsed < self.min_interval:
+                await asyncio.sleep(self.min_interval - elapsed)
+            self.last_call = time.time()
+
+
+def page_type(url):
+    """Budget class of a page: 'forum' for the Discourse forum, 'docs' otherwise."""
+    return "forum" if (urlparse(url).hostname or "").startswith("forum.") else "docs"
+
+
+def max_tokens_for(config, url):
+    budgets = config["llm_max_tokens"] or {}
+    return budgets.get(page_type(url), budgets.get("other"))
+
+
+def compact_prompt(url, content, source):
+    """Prompt for the compact schema: only what the model adds, not the page text itself."""
+    return (f"Summarize the technical page {url} as a JSON object with 'title', 'summary' (at most 5 sentences), "
+            "'code_snippets' (up to 8 commands or config blocks copied verbatim, most useful first) and "
+            f"'category' (one of {', '.join(CATEGORIES)}). Do not repeat the page text. Output ONLY the JSON object.\n\n"
+            f"{source}:\n{content}")
+
+
+def finish_compact(url, text, markdown_key=None):
+    """Compact output as stored: the model's fields plus the URL and the key of the page's Markdown.
+
+    Returns None if the output isn't a JSON object (e.g. cut off by max_tokens).
+    """
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict): return None
+    data.update(url=url, markdown=markdown_key or output_key(url, "md"))
+    return json.dumps(data, ensure_ascii=False)
+
+
+def truncated(response):
+    return response.choices[0].finish_reason == "length"
+
+
+def usage_row(url, model, schema, max_tokens, response, latency):
+    """llm_calls row for one completion (token counts are None if the provider omits them)."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "completion_tokens_details", None)
+    return (url, int(time.time()), model, page_type(url), schema, getattr(usage, "prompt_tokens", None),
+            getattr(usage, "completion_tokens", None), getattr(details, "reasoning_tokens", None), max_tokens,
+            response.choices[0].finish_reason, round(latency, 3))
+
+
+async def extract_with(extractor, url, content, source, markdown_key):
+    """One extraction through `extractor.complete`, shared by the LLM backends.
+
+    Output cut off by max_tokens is retried once with twice the budget: it is
+    never valid JSON, and the same budget would cut it off again.
+    """
+    max_tokens = max_tokens_for(extractor.config, url)
+    prompt = extractor.build_prompt(url, content, source)
+    try:
+        response = await extractor.complete(url, prompt, max_tokens)
+        if truncated(response) and max_tokens:
+            print(f"  [LLM] Output cut off at {max_tokens} tokens, retrying with {max_tokens * 2}")
+            max_tokens *= 2
+            response = await extractor.complete(url, prompt, max_tokens)
+    except Exception as e:
+        print(f"  [LLM ERR] {e}")
+        return None
+    if truncated(response):
+        raise OutputTruncated(f"Output cut off at {max_tokens or 'the default'} max_tokens")
+    text = clean_llm_json(response.choices[0].message.content)
+    return finish_compact(url, text, markdown_key) if extractor.schema == "compact" else text
+
+
+def prompt_version(extractor):
+    """Model plus a hash of the prompt template, so re-extraction can tell stale outputs apart."""
+    template = extractor.build_prompt("{url}", "{content}", "{source}")
+    return f"{extractor.settings['model']}:{hashlib.sha1(template.encode('utf-8')).hexdigest()[:10]}"
+
+
+class NvidiaExtractor:
+    """NVIDIA integrate API through the OpenAI-compatible client."""
+
+    def __init__(self, config):
+        from openai import AsyncOpenAI
+
+        self.config = config
+        self.settings = config["nvidia"]
+        self.max_prompt_chars = config["max_prompt_chars"]
+        self.schema = config["extract_schema"]
+        self.client = AsyncOpenAI(api_key=self.settings["api_key"], base_url=self.settings["base_url"])
+        self.limiter = RateLimiter(config["llm_rpm"])
+        # Called with a usage_row() per completed call (the pipeline records them in the state DB)
+        self.on_usage = None
+
+    def build_prompt(self, url, content, source="HTML"):
+        if self.schema == "compact": return compact_prompt(url, content[:self.max_prompt_chars], source)
+        return f"Extract technical documentation from {url} into a JSON object with 'title', 'content' (markdown), and 'code_snippets'. Output ONLY the JSON object.\n\n{source}:\n{content[:self.max_prompt_chars]}"
+
+    async def complete(self, url, prompt, max_tokens):
+        await self.limiter.wait()
+        t_call = time.time()
+        response = await self.client.chat.completions.create(
+            model=self.settings["model"],
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.1,
+            max_tokens=max_tokens,
+            extra_body=None if self.config["llm_reasoning"] else NVIDIA_NO_REASONING,
+            # response_format is broken for this model on NVIDIA endpoint
+        )
+        if self.on_usage: self.on_usage(usage_row(url, self.settings["model"], self.schema, max_tokens, response, time.time() - t_call))
+        return response
+
+    async def extract(self, url, content, source="HTML", markdown_key=None):
+        """`content` is pruned HTML, or stored Markdown with source="Markdown" (from `markdown_key`).
+
+        Returns None on a failed call; raises OutputTruncated if the output is cut off twice.
+        """
+        return await extract_with(self, url, content, source, markdown_key)
+
+    async def close(self):
+        await self.client.close()
+
+
+def _import_litellm():
+    import litellm
+    try:
+        from litellm.litellm_core_utils.model_param_helper import ModelParamHelper
+        # Override the buggy function that tries to access __annotations__
+        ModelParamHelper._get_litellm_supported_transcription_kwargs = staticmethod(lambda: set())
+    except Exception:
+        # Fallback if imports change, though the above is the current path in stack trace
+        pass
+    litellm.set_verbose = False
+    litellm.drop_params = True
+    logging.getLogger("LiteLLM").setLevel(logging.CRITICAL)
+    return litellm
+
+
+class GeminiExtractor:
+    """Google Gemini through litellm."""
+
+    def __init__(self, config):
+        self.litellm = _import_litellm()
+        self.settings = config["gemini"]
+        if not self.settings["api_key"]:
+            raise ValueError("GEMINI_API_KEY environment variable not set.")
+        self.config = config
+        self.max_prompt_chars = config["max_prompt_chars"]
+        self.schema = config["extract_schema"]
+        self.limiter = RateLimiter(config["llm_rpm"])
+        self.on_usage = None
+
+    def build_prompt(self, url, content, source="HTML"):
+        if self.schema == "compact": return compact_prompt(url, content[:self.max_prompt_chars], source)
+        return (f"Extract the main content of {url}, including titles, sections, and technical details. "
+                "Format the output as a clean JSON with 'title', 'main_content' (in markdown), and 'category' "
+                "(e.g., documentation, blog, forum). Output ONLY the JSON object.\n\n"
+                f"{source}:\n{content[:self.max_prompt_chars]}")
+
+    async def complete(self, url, prompt, max_tokens):
+        await self.limiter.wait()
+        # litellm maps "disable" to a zero thinking budget on Gemini 2.5 (and drops it elsewhere)
+        reasoning = {} if self.config["llm_reasoning"] else {"reasoning_effort": "disable"}
+        t_call = time.time()
+        response = await self.litellm.acompletion(
+            model=self.settings["model"],
+            messages=[{"role": "user", "content": prompt}],
+            api_key=self.settings["api_key"],
+            temperature=0.1,
+            max_tokens=max_tokens,
+            **reasoning,
+        )
+        if self.on_usage: self.on_usage(usage_row(url, self.settings["model"], self.schema, max_tokens, response, time.time() - t_call))
+        return response
+
+    async def extract(self, url, content, source="HTML", markdown_key=None):
+        return await extract_with(self, url, content, source, markdown_key)
+
+    async def close(self):
+        pass
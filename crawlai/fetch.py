@@ -0,0 +1,209 @@
+"""Fetch stage backends."""
+import asyncio
+from collections import Counter, namedtuple
+from urllib.parse import urlparse
+
+FetchResult = namedtuple("FetchResult", "url success html markdown status_code error_message")
+
+# Playwright errors that mean the browser itself is gone, not just this page
+BROWSER_CRASH_MARKERS = ["TargetClosedError", "browser has been closed", "detached"]
+
+
+class BrowserCrashed(Exception):
+    """The browser must be restarted before the URL can be fetched again."""
+
+
+def cap_page(url, html, markdown, max_chars):
+    """Truncate oversized pages before anything parses them."""
+    if len(html) > max_chars or len(markdown) > max_chars:
+        print(f"  [TRIM] {url}: {len(html)} HTML / {len(markdown)} Markdown chars cut to {max_chars}")
+        html, markdown = html[:max_chars], markdown[:max_chars]
+    return html, markdown
+
+
+# Rough transfer size in KiB of the resources the blocker aborts. They are never
+# requested, so bytes saved can only be estimated from their count and type.
+TYPICAL_KB = {"image": 20, "media": 500, "font": 40, "stylesheet": 30, "script": 40}
+OTHER_KB = 5
+
+
+def host_in(host, domains):
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class PageTraffic:
+    """Requests blocked and bytes actually loaded while fetching one page."""
+
+    def __init__(self):
+        self.blocked = Counter()  # resource type -> aborted requests
+        self.loaded = 0
+        self.loaded_bytes = 0
+
+    @property
+    def saved_kb(self):
+        return sum(TYPICAL_KB.get(kind, OTHER_KB) * n for kind, n in self.blocked.items())
+
+    def summary(self):
+        return f"Blocked: {sum(self.blocked.values())} (~{self.saved_kb}KB saved) | Loaded: {self.loaded} ({self.loaded_bytes // 1024}KB)"
+
+
+class ResourceBlocker:
+    """Playwright route handler that aborts requests the extraction never uses.
+
+    A request is aborted if its resource type is in block_resource_types, its
+    host is in block_hosts or, with block_third_party, outside allowed_domains.
+    The page's own document (main frame navigation) is always let through.
+    """
+
+    def __init__(self, config):
+        self.types = set(config["block_resource_types"])
+        self.hosts = config["block_hosts"]
+        self.first_party = config["allowed_domains"] if config["block_third_party"] else None
+        self.pages = {}  # url -> PageTraffic of the fetch in progress
+
+    def should_block(self, request):
+        if request.is_navigation_request() and request.frame.parent_frame is None: return False
+        if request.resource_type in self.types: return True
+        host = urlparse(request.url).hostname or ""
+        if host_in(host, self.hosts): return True
+        return self.first_party is not None and not host_in(host, self.first_party)
+
+    async def before_goto(self, page, context=None, url=None, **kwargs):
+        """Crawl4AI hook: route every request of the new page through the blocker."""
+        traffic = self.pages[url] = PageTraffic()
+
+        async def handle(route):
+            request = route.request
+            if self.should_block(request):
+                traffic.blocked[request.resource_type] += 1
+                await route.abort("blockedbyclient")
+            else:
+                await route.continue_()
+
+        async def finished(request):
+            try:
+                sizes = await request.sizes()
+                traffic.loaded_bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+                traffic.loaded += 1
+            except Exception:
+                pass
+
+        await page.route("**/*", handle)
+        page.on("requestfinished", finished)
+        return page
+
+
+class Crawl4AIFetcher:
+    """Headless Chromium through Crawl4AI (imported on start)."""
+
+    def __init__(self, config):
+        self.config = config
+        self.crawler = None
+        self.run_config = None
+        self.blocker = ResourceBlocker(config) if config["block_resources"] else None
+        self._restart_lock = asyncio.Lock()
+        # Cleared while the browser is (re)starting; fetch() waits on it
+        self._ready = asyncio.Event()
+
+    async def start(self):
+        from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+
+        print("[INIT] Starting fresh browser instance...")
+        self.run_config = CrawlerRunConfig(
+            cache_mode=CacheMode.BYPASS,
+            wait_until=self.config["wait_until"],
+            page_timeout=self.config["page_timeout"],
+            word_count_threshold=self.config["word_count_threshold"],
+        )
+        self.crawler = AsyncWebCrawler(config=BrowserConfig(
+            headless=self.config["headless"],
+            light_mode=self.config["browser_light_mode"],
+            extra_args=self.config["browser_extra_args"],
+        ))
+        if self.blocker:
+            self.crawler.crawler_strategy.set_hook("before_goto", self.blocker.before_goto)
+        await self.crawler.start()
+        self._ready.set()
+
+    async def close(self):
+        if self.crawler:
+            try: await self.crawler.close()
+            except Exception: pass
+            self.crawler = None
+
+    async def restart(self, crawler):
+        """Restart the browser once, even if several workers saw the same crash."""
+        async with self._restart_lock:
+            if self.crawler is crawler:
+                # Other workers must not pick up the closed (or not yet started) crawler
+                self._ready.clear()
+                try:
+                    await self.close()
+                    await self.start()
+                finally:
+                    self._ready.set()
+
+    async def fetch(self, url):
+        await self._ready.wait()
+        crawler = self.crawler
+        result = None
+        try:
+            for attempt in range(self.config["fetch_attempts"]):
+                try:
+                    result = await crawler.arun(url=url, config=self.run_config)
+                    if result.success: break
+                except Exception:
+                    if attempt + 1 < self.config["fetch_attempts"]: await asyncio.sleep(2)
+                    else: raise
+        except Exception as e:
+            self.page_traffic(url)
+            if any(x in str(e) for x in BROWSER_CRASH_MARKERS):
+                await self.restart(crawler)
+                raise BrowserCrashed(str(e)) from e
+            raise
+        if result is None:
+            return FetchResult(url, False, "", "", None, "Unknown")
+        # Keep only capped copies; Crawl4AI's result (cleaned HTML, media, links...) is dropped on return
+        html, markdown = cap_page(url, result.html or "", str(result.markdown or ""), self.config["max_page_chars"])
+        return FetchResult(url, bool(result.success), html, markdown, getattr(result, "status_code", None), result.error_message)
+
+    async def recycle(self):
+        """Fresh browser process, e.g. to give back memory Chromium has accumulated."""
+        await self.restart(self.crawler)
+
+    def page_traffic(self, url):
+        """PageTraffic of the last fetch of `url` (None without resource blocking)."""
+        return self.blocker.pages.pop(url, None) if self.blocker else None
+
+
+class ReplayFetcher:
+    """Serve pages from a FetchArchive instead of the network."""
+
+    def __init__(self, config):
+        from crawlai.archive import FetchArchive
+
+        if not config["archive_dir"]:
+            raise ValueError("The replay fetcher needs --archive-dir")
+        self.archive = FetchArchive(config["archive_dir"])
+
+    def known_urls(self):
+        """Every archived URL, so replay can seed the frontier without discovery."""
+        return self.archive.urls()
+
+    async def start(self):
+        print(f"[INIT] Replaying from {self.archive.directory} ({len(self.archive.urls())} captures)")
+
+    async def close(self):
+        self.archive.close()
+
+    async def recycle(self):
+        pass
+
+    def page_traffic(self, url):
+        return None
+
+    async def fetch(self, url):
+        result = self.archive.read(url)
+        if result is None:
+            return FetchResult(url, False, "", "", None, "Not in archive")
+        return result
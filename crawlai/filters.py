@@ -0,0 +1,26 @@
+"""URL normalization and the domain/blacklist/extension filters."""
+from urllib.parse import urljoin, urlparse
+
+from crawlai.config import ALLOWED_DOMAINS, BLACKLIST_PATTERNS, EXCLUDED_EXTENSIONS
+
+
+def normalize_url(base_url, href):
+    """Resolve a link the way discovery stores it (no fragment/query, no trailing slash)."""
+    raw_href = href.split('#')[0].split('?')[0].strip().rstrip('/')
+    if not raw_href or raw_href.startswith(('mailto:', 'tel:', 'javascript:')): return None
+    return urljoin(base_url, raw_href)
+
+
+def is_noise(url):
+    """Blacklisted path/host or a binary/log extension."""
+    lowered = url.lower()
+    return any(p in lowered for p in BLACKLIST_PATTERNS) or lowered.endswith(EXCLUDED_EXTENSIONS)
+
+
+def is_allowed_domain(url, allowed_domains=ALLOWED_DOMAINS):
+    host = urlparse(url).hostname or ""
+    return any(host == d or host.endswith('.' + d) for d in allowed_domains)
+
+
+def is_crawlable(url, allowed_domains=ALLOWED_DOMAINS):
+    return is_allowed_domain(url, allowed_domains) and not is_noise(url)
@@ -0,0 +1,58 @@
+"""Manifest of stored objects: incremental reconcile against the bucket, and reports.
+
+The crawler records every object it stores in the state DB's `manifest` table,
+so recent-upload and per-URL questions are indexed lookups instead of bucket
+listings. reconcile_step() walks the bucket a slice at a time from a saved
+cursor and fixes drift (objects written by other tools, deleted or replaced).
+"""
+import time
+from datetime import datetime
+from itertools import islice
+
+from crawlai.config import OUTPUT_PREFIX
+from crawlai.storage import output_key
+
+CURSOR = "manifest_reconcile_after"
+# Sorts after every key, for the last slice of a pass
+END_OF_BUCKET = "\U0010ffff"
+
+
+def url_resolver(state):
+    """key -> URL for outputs of completed URLs; the map is only built if a key needs it."""
+    urls = None
+
+    def resolve(key):
+        nonlocal urls
+        if urls is None:
+            urls = {output_key(url, ext): url for url in state.urls_with_status("completed") for ext in ("json", "md")}
+        return urls.get(key)
+    return resolve
+
+
+def reconcile_step(state, store, batch=1000):
+    """Reconcile the next `batch` output keys after the saved cursor.
+
+    Returns (counts, finished); the cursor wraps to the start once a pass reaches the end.
+    """
+    start_after = state.get_meta(CURSOR, "")
+    listed_at = time.time()
+    objects = list(islice(store.list_objects(OUTPUT_PREFIX + "/", start_after), batch))
+    finished = len(objects) < batch
+    last_key = END_OF_BUCKET if finished else objects[-1]["Key"]
+    counts = state.reconcile_manifest(objects, start_after, last_key, url_resolver(state), listed_at)
+    state.set_meta(CURSOR, "" if finished else last_key)
+    return counts, finished
+
+
+def print_uploads(rows):
+    print(f"{'Key':<70} | {'Uploaded':<19} | {'Size':>10} | URL")
+    print("-" * 130)
+    for key, url, size, etag, uploaded_at, missing in rows:
+        uploaded = datetime.fromtimestamp(uploaded_at).strftime('%Y-%m-%d %H:%M:%S')
+        flag = "  [MISSING]" if missing else ""
+        print(f"{key:<70} | {uploaded} | {size / 1024:>7.2f} KB | {url or '-'}{flag}")
+
+
+def print_summary(state):
+    objects, total_bytes, missing = state.manifest_summary()
+    print(f"[MANIFEST] {objects} objects, {total_bytes / 1024 / 1024:.1f} MB, {missing} missing from the bucket")
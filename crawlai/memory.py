@@ -0,0 +1,88 @@
+"""Memory accounting for long runs: process-tree RSS and a watchdog that sheds load."""
+import asyncio
+import gc
+import os
+import time
+
+# Below this fraction of the limit, workers paused by the watchdog are let back in one at a time
+RECOVER_RATIO = 0.7
+# Seconds between two watchdog actions, so RSS can settle after the previous one
+COOLDOWN = 30
+
+
+def tree_rss_kb(root_pid=None):
+    """RSS in KiB of a process plus all its descendants (Chromium), or None without /proc."""
+    if not os.path.isdir("/proc"): return None
+    children, rss = {}, {}
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit(): continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss[int(pid)] = int(line.split()[1])
+                        break
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(parent, []).append(int(pid))
+    total, stack = 0, [root_pid or os.getpid()]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, ()))
+    return total
+
+
+class MemoryWatchdog:
+    """Samples the crawler's RSS every memory_check_seconds.
+
+    Above memory_limit_mb it first halves the pipeline's worker_limit, then,
+    with a single worker left, asks the pipeline to recycle the browser.
+    Every sample also raises the peak recorded for each page in flight.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.limit_kb = pipeline.config["memory_limit_mb"] * 1024
+        self.interval = pipeline.config["memory_check_seconds"]
+        self.last_kb = None
+        self.page_peaks = {}
+        self.next_action_at = 0.0
+
+    def start_page(self, url):
+        self.page_peaks[url] = self.last_kb or 0
+
+    def end_page(self, url):
+        """Peak RSS in MB seen while `url` was in flight (None if RSS can't be read here)."""
+        peak = self.page_peaks.pop(url, 0)
+        return peak / 1024 if peak else None
+
+    def enforce(self, rss_kb):
+        pipeline, now = self.pipeline, time.time()
+        if now < self.next_action_at: return
+        if rss_kb > self.limit_kb:
+            self.next_action_at = now + COOLDOWN
+            if pipeline.worker_limit > 1:
+                pipeline.worker_limit = max(1, pipeline.worker_limit // 2)
+                print(f"  [MEM] RSS {rss_kb // 1024} MB over {self.limit_kb // 1024} MB: workers limited to {pipeline.worker_limit}")
+            else:
+                pipeline.recycle_requested = True
+                print(f"  [MEM] RSS {rss_kb // 1024} MB over {self.limit_kb // 1024} MB: recycling the browser")
+            gc.collect()
+        elif rss_kb < self.limit_kb * RECOVER_RATIO and pipeline.worker_limit < pipeline.config["workers"]:
+            self.next_action_at = now + COOLDOWN
+            pipeline.worker_limit += 1
+            print(f"  [MEM] RSS {rss_kb // 1024} MB: workers back to {pipeline.worker_limit}")
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            rss_kb = await loop.run_in_executor(None, tree_rss_kb)
+            if rss_kb is None: return
+            self.last_kb = rss_kb
+            for url, peak in self.page_peaks.items():
+                self.page_peaks[url] = max(peak, rss_kb)
+            if self.limit_kb: self.enforce(rss_kb)
+            await asyncio.sleep(self.interval)
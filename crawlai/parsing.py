@@ -0,0 +1,48 @@
+"""HTML pruning, link discovery and LLM output cleanup."""
+import re
+
+from bs4 import BeautifulSoup
+
+from crawlai.config import ALLOWED_DOMAINS
+from crawlai.filters import is_crawlable, normalize_url
+
+
+def _prune(soup):
+    for tag in soup(["script", "style", "nav", "footer", "header", "aside", "form", "iframe", "svg", "meta", "link"]):
+        tag.decompose()
+    for noisy in soup.select('.nav, .navbar, .footer, .sidebar, .ad, .avatar, .signature, .social-share'):
+        noisy.decompose()
+
+
+def _links(soup, base_url, allowed_domains):
+    """Crawlable links on the page, normalized and de-duplicated in page order."""
+    found = {}
+    for a in soup.find_all('a', href=True):
+        full_url = normalize_url(base_url, a['href'])
+        if full_url and is_crawlable(full_url, allowed_domains):
+            found.setdefault(full_url, None)
+    return list(found)
+
+
+def parse_page(base_url, html, allowed_domains=ALLOWED_DOMAINS):
+    """(pruned HTML, links) from a single parse of the page.
+
+    Links are collected before pruning, so nav and footer links still count.
+    The tree is decomposed afterwards to free it now instead of at the next
+    garbage collection (BeautifulSoup trees are full of reference cycles).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    links = _links(soup, base_url, allowed_domains)
+    _prune(soup)
+    pruned_html = str(soup)
+    soup.decompose()
+    return pruned_html, links
+
+
+def clean_llm_json(content):
+    """Strip markdown backticks and whitespace from LLM response."""
+    if not content: return None
+    # Remove markdown code blocks if present
+    content = re.sub(r'^```json\s*', '', content.strip())
+    content = re.sub(r'\s*```$', '', content)
+    return content.strip()
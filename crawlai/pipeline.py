@@ -0,0 +1,292 @@
+"""The crawl loop: fetch -> prune -> extract -> store -> discover, per URL."""
+import asyncio
+import gc
+import os
+import time
+
+from crawlai.archive import FetchArchive, upload_archive_files
+from crawlai.backends import load_backend
+from crawlai.cluster import Cluster
+from crawlai.extract import OutputTruncated
+from crawlai.fetch import BrowserCrashed
+from crawlai.filters import is_noise, normalize_url
+from crawlai.manifest import reconcile_step
+from crawlai.memory import MemoryWatchdog
+from crawlai.parsing import parse_page
+from crawlai.retry import classify_exception, classify_fetch
+from crawlai.sitemap import seed_from_sitemaps
+from crawlai.state import StateManager
+from crawlai.storage import output_key
+
+
+class CrawlPipeline:
+    """Runs `config['workers']` concurrent workers over the shared frontier.
+
+    on_page_stats, if given, is called with a dict of per-stage timings for
+    every completed page (used by benchmarks/).
+    """
+
+    def __init__(self, config, on_page_stats=None):
+        self.config = config
+        self.on_page_stats = on_page_stats
+        self.store = load_backend("store", config["store"])(config)
+        self.fetcher = load_backend("fetcher", config["fetcher"])(config)
+        self.extractor = load_backend("extractor", config["extractor"])(config)
+        self.archive = None
+        if config["archive_dir"] and config["fetcher"] != "replay":
+            self.archive = FetchArchive(config["archive_dir"], config["archive_segment_mb"] * 1024 * 1024)
+        self.state = None
+        # Where new URLs go: the state DB, or the cluster router in cluster mode
+        self.frontier = None
+        self.cluster = None
+        self.processed_count = 0
+        self.in_flight = 0
+        self.waiting_for_retries = False
+        # Lowered by the memory watchdog when RSS is over memory_limit_mb
+        self.worker_limit = config["workers"]
+        self.recycle_requested = False
+        self.watchdog = MemoryWatchdog(self)
+        self._sync_lock = asyncio.Lock()
+
+    def restore_state(self):
+        print("[INIT] Restoring state...")
+        self.store.download_file(self.config["state_key"], self.config["db_path"])
+        self.state = StateManager(self.config["db_path"], self.config["retry_max_attempts"], self.config["retry_base_delay"],
+                                  self.config["retry_max_delay"], self.config["lease_seconds"])
+        # Nothing can still be processing these: the previous run died mid-page
+        reclaimed = self.state.reclaim_all()
+        if reclaimed: print(f"  [RETRY] {reclaimed} URLs left 'processing' by the last run re-queued")
+        if self.config["retry_failed"]:
+            print(f"  [RETRY] {self.state.requeue_failed()} failed URLs re-queued")
+        self.frontier = self.state
+        self.extractor.on_usage = self.state.record_llm_call
+
+    async def join_cluster(self):
+        self.cluster = Cluster(self.config, self.store, self.state)
+        await asyncio.get_running_loop().run_in_executor(None, self.cluster.start)
+        self.frontier = self.cluster
+
+    async def seed(self):
+        loop = asyncio.get_running_loop()
+        # Same form as discovered and sitemap links, so the home page is queued once
+        start_url = self.config["start_url"]
+        self.frontier.add_urls([normalize_url(start_url, start_url)], 0)
+        if hasattr(self.fetcher, "known_urls"):
+            urls = self.fetcher.known_urls()
+            self.frontier.add_urls(urls, 0)
+            print(f"  [SEED] {len(urls)} URLs queued from the fetch archive")
+        if self.config["sitemap_urls"]:
+            if self.cluster and not await loop.run_in_executor(None, self.cluster.should_seed):
+                print("  [SEED] Sitemaps were seeded recently by another node")
+            else:
+                print("[INIT] Seeding frontier from sitemaps...")
+                t_seed = time.time()
+                seeded = await loop.run_in_executor(
+                    None, seed_from_sitemaps, self.frontier, self.config["sitemap_urls"], self.config["allowed_domains"])
+                print(f"  [SEED] {seeded} URLs added or updated in {time.time()-t_seed:.1f}s")
+        if self.cluster: await loop.run_in_executor(None, self.cluster.flush_outbox)
+
+    async def archive_page(self, result):
+        rolled = self.archive.write(result)
+        if rolled and self.config["archive_upload"]:
+            print(f"  [ARCHIVE] Uploading {os.path.basename(rolled)}...")
+            await upload_archive_files(self.store, self.archive, rolled, self.config["archive_prefix"])
+
+    async def sync_state(self):
+        """Upload a consistent snapshot of the state DB."""
+        async with self._sync_lock:
+            snapshot = self.state.snapshot(self.config["db_path"] + ".sync")
+            await self.store.upload_file(snapshot, self.config["state_key"])
+            try: os.remove(snapshot)
+            except OSError: pass
+
+    async def reconcile(self):
+        """Check the next slice of the bucket against the manifest."""
+        counts, finished = await asyncio.get_running_loop().run_in_executor(
+            None, reconcile_step, self.state, self.store, self.config["reconcile_batch"])
+        drift = ", ".join(f"{n} {kind}" for kind, n in counts.items() if n) or "no drift"
+        print(f"  [RECONCILE] {drift}{' (pass complete)' if finished else ''}")
+
+    def report_llm_usage(self, since):
+        for schema, kind, calls, prompt, completion, reasoning, latency, cut in self.state.llm_usage(since):
+            think = f", {reasoning:.0f} reasoning" if reasoning else ""
+            print(f"  [LLM] {schema}/{kind}: {calls} calls, avg {prompt or 0:.0f} prompt / {completion or 0:.0f} output tokens{think}, "
+                  f"{latency:.1f}s, {cut} cut off by max_tokens")
+
+    def fail(self, url, error_class, detail):
+        delay = self.state.record_failure(url, error_class)
+        if delay is None: print(f"  [ERR] {detail} ({error_class}, giving up)")
+        else: print(f"  [ERR] {detail} ({error_class}, retry in {delay:.0f}s)")
+
+    async def process_page(self, url, depth):
+        if is_noise(url):
+            self.state.update_status(url, "skipped")
+            return
+
+        print(f"\n[NEXT] {url}")
+        t_start = time.time()
+        timings = {}
+
+        try:
+            # 1. FETCH
+            result = await self.fetcher.fetch(url)
+            timings["fetch"] = time.time() - t_start
+            traffic = self.fetcher.page_traffic(url)
+
+            if not result.success:
+                self.fail(url, classify_fetch(result), f"Fetch failed: {result.error_message}")
+                return
+            if self.archive: await self.archive_page(result)
+
+            # 2. PARSE: one tree for pruning and discovery. Only what the prompt can
+            # use is kept, so the raw HTML is not held through the LLM wait.
+            t_stage = time.time()
+            pruned_html, links = parse_page(url, result.html, self.config["allowed_domains"])
+            pruned_html = pruned_html[:self.config["max_prompt_chars"]]
+            markdown = result.markdown
+            del result
+            timings["prune"] = time.time() - t_stage
+
+            # 3. LLM
+            t_stage = time.time()
+            extracted_json = await self.extractor.extract(url, pruned_html)
+            del pruned_html
+            timings["llm"] = time.time() - t_stage
+
+            if not extracted_json:
+                self.fail(url, "extract_empty", "Extraction results were None or empty.")
+                return
+
+            # 4. STORE
+            t_stage = time.time()
+            json_obj, md_obj = await asyncio.gather(
+                self.store.put_text(output_key(url, "json"), extracted_json, "application/json"),
+                self.store.put_text(output_key(url, "md"), markdown, "text/markdown; charset=utf-8"))
+            del markdown, extracted_json
+            timings["upload"] = time.time() - t_stage
+            if not json_obj or not md_obj:
+                # LocalStore always succeeds, so None only ever means an S3 failure
+                self.fail(url, "store_error", "Upload failed.")
+                return
+            self.state.record_uploads([(obj.key, url, obj.size, obj.etag) for obj in (json_obj, md_obj)])
+
+            # Discovery
+            t_stage = time.time()
+            self.frontier.add_urls(links, depth + 1)
+            timings["discover"] = time.time() - t_stage
+
+            self.state.update_status(url, "completed")
+            self.processed_count += 1
+
+            print(f"  [DONE] Stored.")
+            print(f"  [JSON] {json_obj.link}")
+            print(f"  [MD  ] {md_obj.link}")
+            timings["total"] = time.time() - t_start
+            peak_rss_mb = self.watchdog.end_page(url)
+            rss = f" | Peak RSS: {peak_rss_mb:.0f}MB" if peak_rss_mb else ""
+            print(f"  [STATS] Total: {timings['total']:.1f}s | Fetch: {timings['fetch']:.1f}s | Prune: {timings['prune']:.2f}s | LLM: {timings['llm']:.1f}s | Store: {timings['upload']:.1f}s | Discover: {len(links)}{rss}")
+            if traffic: print(f"  [NET] {traffic.summary()}")
+            if self.on_page_stats:
+                net = {"blocked": sum(traffic.blocked.values()), "saved_kb": traffic.saved_kb, "loaded_kb": traffic.loaded_bytes / 1024} if traffic else {}
+                self.on_page_stats({"url": url, "peak_rss_mb": peak_rss_mb, **net, **timings})
+
+            if self.processed_count % self.config["sync_every"] == 0:
+                print("  [SYNC] Periodic state backup...")
+                await self.sync_state()
+            if self.config["reconcile_every"] and self.processed_count % self.config["reconcile_every"] == 0:
+                await self.reconcile()
+
+        except BrowserCrashed:
+            # The fetcher already restarted the browser; retry this URL later
+            print(f"  [FIX] Browser/Navigation error. Browser was reset.")
+            self.fail(url, "browser_crash", "Browser crashed")
+        except OutputTruncated as e:
+            # A larger llm_max_tokens budget is needed; --retry-failed re-queues it after raising it
+            self.fail(url, "extract_truncated", str(e))
+        except Exception as e:
+            self.fail(url, classify_exception(e), f"Page Loop: {e}")
+
+    async def worker(self):
+        while True:
+            if self.recycle_requested:
+                # Let in-flight pages finish, then restart the browser from a single worker.
+                # The recycle counts as in flight and the request stays set until it is
+                # done, so no other worker recycles too or claims a URL meanwhile.
+                if self.in_flight == 0:
+                    print("  [MEM] Recycling the browser...")
+                    self.in_flight += 1
+                    try:
+                        await self.fetcher.recycle()
+                    finally:
+                        self.in_flight -= 1
+                        self.recycle_requested = False
+                    gc.collect()
+                await asyncio.sleep(0.5)
+                continue
+            if self.in_flight >= self.worker_limit:
+                # Paused by the memory watchdog
+                await asyncio.sleep(0.5)
+                continue
+            row = self.frontier.claim_pending_url()
+            if not row:
+                # Other workers may still discover links; stop once everyone is idle
+                # and no retries are scheduled
+                if self.in_flight == 0:
+                    wait = self.state.seconds_until_next_attempt()
+                    if wait is None and (not self.cluster or self.cluster.quiet()): return
+                    if wait is not None and not self.waiting_for_retries:
+                        print(f"\n[WAIT] Only scheduled retries left, next in {wait:.0f}s")
+                        self.waiting_for_retries = True
+                    await asyncio.sleep(min(max(wait or 0, 0.5), 5))
+                    continue
+                await asyncio.sleep(0.5)
+                continue
+            self.waiting_for_retries = False
+            if self.cluster: self.cluster.last_activity = time.time()
+            self.in_flight += 1
+            self.watchdog.start_page(row[0])
+            try:
+                await self.process_page(*row)
+            finally:
+                self.in_flight -= 1
+                self.watchdog.end_page(row[0])
+            await asyncio.sleep(0.1)
+
+    async def run(self):
+        t_run = int(time.time())
+        maintenance = None
+        watchdog = asyncio.create_task(self.watchdog.run())
+        try:
+            self.restore_state()
+            if self.config["cluster_shards"]:
+                await self.join_cluster()
+                maintenance = asyncio.create_task(self.cluster.maintain(self.sync_state))
+            await self.seed()
+            await self.fetcher.start()
+            await asyncio.gather(*(self.worker() for _ in range(self.config["workers"])))
+            print("\n[DONE] No more pending URLs.")
+        except KeyboardInterrupt:
+            print("\n[STOP] User interrupted.")
+        finally:
+            watchdog.cancel()
+            if maintenance:
+                maintenance.cancel()
+                await asyncio.gather(maintenance, return_exceptions=True)
+            if self.cluster:
+                # Hand every shard back so other nodes can take over right away
+                await asyncio.get_running_loop().run_in_executor(None, self.cluster.stop)
+            await self.fetcher.close()
+            await self.extractor.close()
+            if self.archive:
+                rolled = self.archive.roll()
+                if self.config["archive_upload"]:
+                    await upload_archive_files(self.store, self.archive, rolled, self.config["archive_prefix"])
+                self.archive.close()
+            if self.state:
+                self.report_llm_usage(t_run)
+                await self.sync_state()
+            self.store.close()
+
+
+async def crawl(config, on_page_stats=None):
+    await CrawlPipeline(config, on_page_stats).run()
@@ -0,0 +1,190 @@
+"""Regenerate extraction JSON from the Markdown already stored under extracted_data/.
+
+Markdown objects are listed lazily and downloaded by a pool of GET workers into
+a bounded queue; a smaller pool of LLM workers extracts from it and writes the
+JSON next to the Markdown. Progress lives in a checkpoint DB keyed by object,
+so a restarted job (or a new Colab session, via the store) resumes where it
+stopped and skips objects whose Markdown ETag and extractor version are unchanged.
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from crawlai.backends import load_backend
+from crawlai.config import OUTPUT_PREFIX
+from crawlai.extract import prompt_version
+from crawlai.state import LLM_CALL_COLUMNS, LLM_CALLS_TABLE, StateManager
+from crawlai.storage import UPLOAD_THREADS, output_key
+
+LIST_BATCH = 1000
+
+
+class Checkpoint:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS reextract (
+                key TEXT PRIMARY KEY,
+                md_etag TEXT,
+                version TEXT,
+                status TEXT,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.conn.execute(LLM_CALLS_TABLE)
+        self.conn.commit()
+
+    def is_current(self, key, md_etag, version):
+        row = self.conn.execute("SELECT md_etag, version, status FROM reextract WHERE key = ?", (key,)).fetchone()
+        return row == (md_etag, version, "done")
+
+    def record(self, key, md_etag, version, status):
+        self.conn.execute("INSERT OR REPLACE INTO reextract (key, md_etag, version, status, updated_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                          (key, md_etag, version, status))
+        self.conn.commit()
+
+    def record_llm_call(self, row):
+        self.conn.execute(f"INSERT INTO llm_calls ({LLM_CALL_COLUMNS}) VALUES ({', '.join('?' * 11)})", row)
+        self.conn.commit()
+
+    def snapshot(self, target_path):
+        with sqlite3.connect(target_path) as dst:
+            self.conn.backup(dst)
+        return target_path
+
+    def close(self):
+        self.conn.close()
+
+
+def load_url_map(db_path):
+    """Markdown key -> original URL from a crawl state DB, when one is available."""
+    if not db_path or not os.path.exists(db_path): return {}
+    return {output_key(url, "md"): url for url in StateManager(db_path).urls_with_status("completed")}
+
+
+class ReextractJob:
+    def __init__(self, config, checkpoint_path="reextract_state.db", get_concurrency=16, llm_concurrency=4, limit=None, force=False):
+        self.config = config
+        # One connection per GET thread, plus the store's own upload threads
+        store_config = dict(config, s3_max_pool_connections=max(config["s3_max_pool_connections"], get_concurrency + UPLOAD_THREADS))
+        self.store = load_backend("store", config["store"])(store_config)
+        self.extractor = load_backend("extractor", config["extractor"])(config)
+        self.version = prompt_version(self.extractor)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_key = os.path.basename(checkpoint_path)
+        self.get_concurrency = get_concurrency
+        # Dedicated pool: the default executor is too small on a 2-core Colab VM
+        self.get_executor = ThreadPoolExecutor(max_workers=get_concurrency)
+        self.llm_concurrency = llm_concurrency
+        self.limit = limit
+        self.force = force
+        self.counts = {"listed": 0, "skipped": 0, "done": 0, "failed": 0}
+        self.t_start = time.time()
+
+    async def sync_checkpoint(self):
+        snapshot = self.checkpoint.snapshot(self.checkpoint_path + ".sync")
+        await self.store.upload_file(snapshot, self.checkpoint_key)
+        os.remove(snapshot)
+
+    def report(self):
+        elapsed = time.time() - self.t_start
+        rate = self.counts["done"] / elapsed * 60 if elapsed else 0.0
+        print(f"  [PROGRESS] listed {self.counts['listed']} | done {self.counts['done']} | skipped {self.counts['skipped']} | failed {self.counts['failed']} | {rate:.1f}/min")
+
+    async def list_pending(self, todo):
+        """Feed (key, etag) of Markdown objects needing extraction into `todo`."""
+        loop = asyncio.get_running_loop()
+        objects = self.store.list_objects(OUTPUT_PREFIX + "/")
+        queued = 0
+        while True:
+            batch = await loop.run_in_executor(None, lambda: list(islice(objects, LIST_BATCH)))
+            if not batch: break
+            for obj in batch:
+                if not obj["Key"].endswith(".md"): continue
+                self.counts["listed"] += 1
+                if not self.force and self.checkpoint.is_current(obj["Key"], obj["ETag"], self.version):
+                    self.counts["skipped"] += 1
+                    continue
+                await todo.put((obj["Key"], obj["ETag"]))
+                queued += 1
+                if self.limit and queued >= self.limit: return
+
+    async def getter(self, todo, downloaded):
+        loop = asyncio.get_running_loop()
+        while True:
+            key, etag = await todo.get()
+            try:
+                text = await loop.run_in_executor(self.get_executor, self.store.get_text, key)
+                await downloaded.put((key, etag, text))
+            except Exception as e:
+                print(f"  [GET ERR] {key}: {e}")
+                self.checkpoint.record(key, etag, self.version, "failed")
+                self.counts["failed"] += 1
+            finally:
+                todo.task_done()
+
+    async def extractor_worker(self, downloaded):
+        while True:
+            key, etag, markdown = await downloaded.get()
+            try:
+                url = self.url_map.get(key) or key
+                try:
+                    extracted_json = await self.extractor.extract(url, markdown, source="Markdown", markdown_key=key)
+                    stored = extracted_json and await self.store.put_text(key[:-len(".md")] + ".json", extracted_json, "application/json") is not None
+                except Exception as e:
+                    # A dead worker would leave downloaded.join() waiting forever
+                    print(f"  [REEXTRACT ERR] {key}: {e}")
+                    stored = False
+                if stored:
+                    self.checkpoint.record(key, etag, self.version, "done")
+                    self.counts["done"] += 1
+                else:
+                    self.checkpoint.record(key, etag, self.version, "failed")
+                    self.counts["failed"] += 1
+                finished = self.counts["done"] + self.counts["failed"]
+                if finished % 100 == 0:
+                    self.report()
+                    await self.sync_checkpoint()
+            finally:
+                downloaded.task_done()
+
+    async def run(self):
+        print(f"[INIT] Re-extracting {OUTPUT_PREFIX}/*.md with {self.version}")
+        self.store.download_file(self.checkpoint_key, self.checkpoint_path)
+        self.checkpoint = Checkpoint(self.checkpoint_path)
+        self.extractor.on_usage = self.checkpoint.record_llm_call
+        # A fresh session has no state DB yet; without it pages are named by their object key
+        if not os.path.exists(self.config["db_path"]):
+            self.store.download_file(self.config["state_key"], self.config["db_path"])
+        self.url_map = load_url_map(self.config["db_path"])
+        if not self.url_map:
+            print(f"  [STATE] No completed URLs in {self.config['db_path']}: prompts and output name pages by "
+                  "their Markdown key, and every page gets the docs token budget.")
+        # Bounded queues keep at most a few pages in memory per worker
+        todo = asyncio.Queue(maxsize=self.get_concurrency * 2)
+        downloaded = asyncio.Queue(maxsize=self.llm_concurrency * 2)
+        workers = [asyncio.create_task(self.getter(todo, downloaded)) for _ in range(self.get_concurrency)]
+        workers += [asyncio.create_task(self.extractor_worker(downloaded)) for _ in range(self.llm_concurrency)]
+        try:
+            await self.list_pending(todo)
+            await todo.join()
+            await downloaded.join()
+        except KeyboardInterrupt:
+            print("\n[STOP] User interrupted.")
+        finally:
+            for w in workers: w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.report()
+            await self.sync_checkpoint()
+            self.checkpoint.close()
+            self.get_executor.shutdown(wait=False)
+            await self.extractor.close()
+            self.store.close()
+
+
+async def reextract(config, **options):
+    await ReextractJob(config, **options).run()
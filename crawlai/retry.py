@@ -0,0 +1,46 @@
+"""Failure classes and retry backoff for the crawl frontier."""
+import asyncio
+import random
+
+# error_class -> retryable. Non-retryable failures are final on the first attempt.
+ERROR_CLASSES = {
+    "fetch_timeout": True,
+    "fetch_network": True,
+    "http_transient": True,   # 429 and 5xx
+    "http_permanent": False,  # other 4xx (404, 410, ...)
+    "not_archived": False,    # replay fetcher has no capture for the URL
+    "browser_crash": True,
+    "extract_empty": True,    # LLM error, 429 or unparseable output
+    "extract_truncated": False,  # output hit max_tokens even with a doubled budget
+    "store_error": True,
+    "lease_expired": True,    # left 'processing' by a crashed or killed run
+    "unexpected": True,
+}
+
+
+def is_retryable(error_class):
+    return ERROR_CLASSES.get(error_class, True)
+
+
+def classify_fetch(result):
+    """Error class for an unsuccessful FetchResult."""
+    code = result.status_code
+    if code == 429 or (code and code >= 500): return "http_transient"
+    if code and 400 <= code < 500: return "http_permanent"
+    message = (result.error_message or "").lower()
+    if message == "not in archive": return "not_archived"
+    if "timeout" in message: return "fetch_timeout"
+    return "fetch_network"
+
+
+def classify_exception(e):
+    message = str(e).lower()
+    if isinstance(e, asyncio.TimeoutError) or "timeout" in message: return "fetch_timeout"
+    if "net::" in message: return "fetch_network"
+    return "unexpected"
+
+
+def backoff_delay(attempts, base, cap):
+    """Exponential backoff with jitter: half the delay is fixed, half random."""
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
@@ -0,0 +1,563 @@
+"""SQLite crawl frontier shared by every profile.
+
+URLs are stored compactly: the scheme + host and the first path segment are
+interned in the `hosts` and `prefixes` tables, and each `frontier` row keeps
+only the rest of the URL. Rows are keyed by a 64-bit hash of the full URL; on
+a collision the next free key is used (linear probing), so lookups compare the
+stored URL and walk on until they hit it or an empty key. Statuses are small
+integers and timestamps unix seconds. The `urls` view shows the old layout
+(full URL, status names, datetimes) for ad-hoc queries.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+from crawlai.retry import backoff_delay, is_retryable
+
+STATUSES = ("pending", "processing", "completed", "failed", "skipped")
+STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+PENDING, PROCESSING, COMPLETED, FAILED = (STATUS_CODES[name] for name in ("pending", "processing", "completed", "failed"))
+
+NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+FRONTIER_COLUMNS = "id, prefix_id, rest, status, depth, priority, last_updated, error_class, attempts, next_attempt_at, lease_until"
+URL_JOIN = "frontier f JOIN prefixes p ON p.id = f.prefix_id JOIN hosts h ON h.id = p.host_id"
+URL_EXPR = "h.origin || p.path || f.rest"
+
+# Columns the pre-interning `urls` table gained after the first release; legacy
+# DBs restored from S3 get them before they are migrated
+ADDED_COLUMNS = {
+    "priority": "INTEGER DEFAULT 0",
+    "error_class": "TEXT",
+    "attempts": "INTEGER DEFAULT 0",
+    "next_attempt_at": "INTEGER DEFAULT 0",
+    "lease_until": "INTEGER DEFAULT 0",
+}
+MIGRATE_BATCH = 50000
+# Rows per statement when a shard is scanned, exported or dropped; each chunk is its
+# own transaction, so the crawl's own writes never wait long on the database lock
+SHARD_CHUNK = 20000
+
+# One row per LLM call, so output budgets and schemas can be compared on real traffic
+LLM_CALLS_TABLE = """
+    CREATE TABLE IF NOT EXISTS llm_calls (
+        url TEXT,
+        called_at INTEGER,
+        model TEXT,
+        page_type TEXT,
+        schema TEXT,
+        prompt_tokens INTEGER,
+        completion_tokens INTEGER,
+        reasoning_tokens INTEGER,
+        max_tokens INTEGER,
+        finish_reason TEXT,
+        latency REAL
+    )
+"""
+LLM_CALL_COLUMNS = "url, called_at, model, page_type, schema, prompt_tokens, completion_tokens, reasoning_tokens, max_tokens, finish_reason, latency"
+
+
+def url_hash(url):
+    """Signed 64-bit key of a URL (SQLite INTEGER PRIMARY KEY range)."""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def next_key(key):
+    return key + 1 if key < 2 ** 63 - 1 else -2 ** 63
+
+
+def split_url(url):
+    """(origin, prefix, rest) with origin + prefix + rest == url; prefix is the first path segment.
+
+    Deeper prefixes only pay for themselves when a directory repeats: an interned
+    path is stored twice (row and unique index), and a forum topic is usually a
+    single URL. Interning up to the last '/' made 60k sitemap topic URLs 8.5 MB
+    instead of 5.4 MB, and saved only 10% (11.7 vs 13.0 MB) with 1-13 post links
+    per topic.
+    """
+    scheme_end = url.find("://")
+    path_start = url.find("/", scheme_end + 3) if scheme_end >= 0 else 0
+    if path_start < 0: return url, "", ""
+    origin, path = url[:path_start], url[path_start:]
+    if not path.startswith("/"): return origin, "", path
+    segment_end = path.find("/", 1)
+    prefix = path[:segment_end + 1] if segment_end > 0 else "/"
+    return origin, prefix, path[len(prefix):]
+
+
+class StateManager:
+    """URL frontier with retry bookkeeping.
+
+    Failed URLs are re-queued as 'pending' with a `next_attempt_at` in the
+    future until `max_attempts` is reached (or at once if their error class is
+    not retryable). Claimed URLs hold a lease; 'processing' rows whose lease
+    has expired are put back in the queue.
+    """
+
+    def __init__(self, db_path, max_attempts=5, base_delay=60, max_delay=3600, lease_seconds=900):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self._init_db()
+
+    def _init_db(self):
+        # Autocommit mode with an explicit transaction: Python's sqlite3 runs DDL outside
+        # of its implicit transactions, so a crash mid-migration would otherwise leave the
+        # rename and a half-filled frontier behind
+        with closing(sqlite3.connect(self.db_path, isolation_level=None)) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                migrated = self._create_tables(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction: conn.execute("ROLLBACK")
+                raise
+        if migrated is not None:
+            size_before = os.path.getsize(self.db_path)
+            with closing(sqlite3.connect(self.db_path)) as conn:
+                conn.execute("VACUUM")
+            print(f"[STATE] Migrated {migrated} URLs in {self.db_path} to the interned schema "
+                  f"({size_before / 1024 / 1024:.1f} MB -> {os.path.getsize(self.db_path) / 1024 / 1024:.1f} MB)")
+
+    def _create_tables(self, conn):
+        """Create or upgrade the schema; returns the number of URLs migrated from a legacy DB, or None."""
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "urls" in tables: conn.execute("ALTER TABLE urls RENAME TO urls_legacy")
+        # urls_legacy alone is left by a migration interrupted before it ran in one transaction
+        legacy = "urls" in tables or "urls_legacy" in tables
+        conn.execute("CREATE TABLE IF NOT EXISTS hosts (id INTEGER PRIMARY KEY, origin TEXT UNIQUE)")
+        conn.execute("CREATE TABLE IF NOT EXISTS prefixes (id INTEGER PRIMARY KEY, host_id INTEGER, path TEXT, UNIQUE (host_id, path))")
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS frontier (
+                id INTEGER PRIMARY KEY,
+                prefix_id INTEGER,
+                rest TEXT,
+                status INTEGER DEFAULT {PENDING},
+                depth INTEGER DEFAULT 0,
+                priority INTEGER DEFAULT 0,
+                last_updated INTEGER DEFAULT ({NOW}),
+                error_class TEXT,
+                attempts INTEGER DEFAULT 0,
+                next_attempt_at INTEGER DEFAULT 0,
+                lease_until INTEGER DEFAULT 0
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_frontier_pending ON frontier (status, priority, last_updated)")
+        status_names = " ".join(f"WHEN {code} THEN '{name}'" for code, name in enumerate(STATUSES))
+        conn.execute(f"""
+            CREATE VIEW IF NOT EXISTS urls AS
+            SELECT f.id, {URL_EXPR} AS url, CASE f.status {status_names} END AS status, f.depth, f.priority,
+                   datetime(f.last_updated, 'unixepoch') AS last_updated, f.error_class, f.attempts,
+                   f.next_attempt_at, f.lease_until
+            FROM {URL_JOIN}
+        """)
+        # Every object the crawler stored, so inspection never has to list the bucket.
+        # missing = 1 when the last reconcile pass did not find the object.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS manifest (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                size INTEGER,
+                etag TEXT,
+                uploaded_at INTEGER,
+                missing INTEGER DEFAULT 0
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_manifest_uploaded ON manifest (uploaded_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_manifest_url ON manifest (url)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(LLM_CALLS_TABLE)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_at ON llm_calls (called_at)")
+        return self._migrate_legacy(conn) if legacy else None
+
+    def _migrate_legacy(self, conn):
+        """Move rows of the old `urls` table (full URL as TEXT primary key) into `frontier`."""
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(urls_legacy)")]
+        for name, definition in ADDED_COLUMNS.items():
+            if name not in columns:
+                conn.execute(f"ALTER TABLE urls_legacy ADD COLUMN {name} {definition}")
+        cursor = conn.execute("""
+            SELECT url, status, depth, priority, CAST(strftime('%s', last_updated) AS INTEGER),
+                   error_class, attempts, next_attempt_at, lease_until
+            FROM urls_legacy
+        """)
+        migrated = 0
+        while True:
+            batch = cursor.fetchmany(MIGRATE_BATCH)
+            if not batch: break
+            rows = [(url, STATUS_CODES.get(status, PENDING), depth or 0, priority or 0, updated or int(time.time()), *rest)
+                    for url, status, depth, priority, updated, *rest in batch]
+            migrated += self._stage(conn, rows)
+            conn.execute(f"INSERT INTO frontier ({FRONTIER_COLUMNS}) SELECT {FRONTIER_COLUMNS} FROM incoming WHERE true ON CONFLICT(id) DO NOTHING")
+        conn.execute("DROP TABLE urls_legacy")
+        return migrated
+
+    # URL keys
+
+    def _intern(self, conn, origin, path):
+        conn.execute("INSERT OR IGNORE INTO hosts (origin) VALUES (?)", (origin,))
+        (host_id,) = conn.execute("SELECT id FROM hosts WHERE origin = ?", (origin,)).fetchone()
+        conn.execute("INSERT OR IGNORE INTO prefixes (host_id, path) VALUES (?, ?)", (host_id, path))
+        return conn.execute("SELECT id FROM prefixes WHERE host_id = ? AND path = ?", (host_id, path)).fetchone()[0]
+
+    def _stage(self, conn, rows):
+        """Load (url, status, depth, priority, last_updated, error_class, attempts,
+        next_attempt_at, lease_until) rows into the temp table `incoming`, keyed by
+        the frontier id each URL has (or will get). Returns the number of rows."""
+        conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS incoming AS SELECT {FRONTIER_COLUMNS} FROM frontier WHERE 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS temp.idx_incoming_id ON incoming (id)")
+        conn.execute("DELETE FROM incoming")
+        prefix_ids, staged = {}, []
+        for url, *values in rows:
+            origin, prefix, rest = split_url(url)
+            if (origin, prefix) not in prefix_ids:
+                prefix_ids[origin, prefix] = self._intern(conn, origin, prefix)
+            staged.append((url_hash(url), prefix_ids[origin, prefix], rest, *values))
+        conn.executemany(f"INSERT INTO incoming ({FRONTIER_COLUMNS}) VALUES ({', '.join('?' * 11)})", staged)
+        # Hash collisions, with stored URLs or within the batch, move on to the next free key
+        collided = conn.execute("""
+            SELECT i.rowid, i.id, i.prefix_id, i.rest FROM incoming i
+            WHERE EXISTS (SELECT 1 FROM frontier f WHERE f.id = i.id AND (f.prefix_id != i.prefix_id OR f.rest != i.rest))
+               OR EXISTS (SELECT 1 FROM incoming j WHERE j.id = i.id AND j.rowid < i.rowid AND (j.prefix_id != i.prefix_id OR j.rest != i.rest))
+        """).fetchall()
+        for rowid, key, prefix_id, rest in collided:
+            conn.execute("UPDATE incoming SET id = ? WHERE rowid = ?", (self._probe(conn, key, prefix_id, rest), rowid))
+        return len(staged)
+
+    def _probe(self, conn, key, prefix_id, rest):
+        """First key after `key` that is free or already holds this URL."""
+        while True:
+            key = next_key(key)
+            row = conn.execute("SELECT prefix_id, rest FROM frontier WHERE id = ?", (key,)).fetchone()
+            if row is not None and row != (prefix_id, rest): continue
+            if not conn.execute("SELECT 1 FROM incoming WHERE id = ? AND (prefix_id != ? OR rest != ?)", (key, prefix_id, rest)).fetchone():
+                return key
+
+    def _find(self, conn, url):
+        """Frontier id of `url`, or None if it is not known."""
+        origin, prefix, rest = split_url(url)
+        row = conn.execute("SELECT p.id FROM prefixes p JOIN hosts h ON h.id = p.host_id WHERE h.origin = ? AND p.path = ?",
+                           (origin, prefix)).fetchone()
+        if not row: return None
+        key = url_hash(url)
+        while True:
+            stored = conn.execute("SELECT prefix_id, rest FROM frontier WHERE id = ?", (key,)).fetchone()
+            if stored is None: return None
+            if stored == (row[0], rest): return key
+            key = next_key(key)
+
+    def _url_of(self, conn, key):
+        return conn.execute(f"SELECT {URL_EXPR} FROM {URL_JOIN} WHERE f.id = ?", (key,)).fetchone()[0]
+
+    def _rehome(self, conn):
+        """Re-insert probed rows after deletes, which can break the chain leading to them."""
+        conn.create_function("url_hash", 1, url_hash, deterministic=True)
+        rows = conn.execute(f"""
+            SELECT f.id, {URL_EXPR}, f.status, f.depth, f.priority, f.last_updated, f.error_class, f.attempts, f.next_attempt_at, f.lease_until
+            FROM {URL_JOIN} WHERE f.id != url_hash({URL_EXPR})
+        """).fetchall()
+        if not rows: return
+        conn.executemany("DELETE FROM frontier WHERE id = ?", ((row[0],) for row in rows))
+        self._stage(conn, (row[1:] for row in rows))
+        conn.execute(f"INSERT INTO frontier ({FRONTIER_COLUMNS}) SELECT {FRONTIER_COLUMNS} FROM incoming WHERE true ON CONFLICT(id) DO NOTHING")
+
+    # Frontier
+
+    def add_urls(self, urls, depth=0):
+        """Insert newly discovered URLs in one transaction; known URLs are left alone."""
+        now = int(time.time())
+        with sqlite3.connect(self.db_path) as conn:
+            self._stage(conn, ((u, PENDING, depth, 0, now, None, 0, 0, 0) for u in urls))
+            conn.execute(f"INSERT INTO frontier ({FRONTIER_COLUMNS}) SELECT {FRONTIER_COLUMNS} FROM incoming WHERE true ON CONFLICT(id) DO NOTHING")
+            conn.commit()
+
+    def add_urls_bulk(self, rows):
+        """Insert (url, depth, priority) rows in one transaction.
+
+        Priority is the sitemap lastmod as a unix timestamp. Known URLs keep
+        their status unless they were completed before their lastmod, in which
+        case they are queued again.
+        """
+        now = int(time.time())
+        with sqlite3.connect(self.db_path) as conn:
+            self._stage(conn, ((url, PENDING, depth, priority, now, None, 0, 0, 0) for url, depth, priority in rows))
+            changed = conn.execute(f"""
+                INSERT INTO frontier ({FRONTIER_COLUMNS}) SELECT {FRONTIER_COLUMNS} FROM incoming WHERE true
+                ON CONFLICT(id) DO UPDATE SET
+                    priority = MAX(frontier.priority, excluded.priority),
+                    status = CASE
+                        WHEN frontier.status = {COMPLETED} AND excluded.priority > frontier.last_updated
+                        THEN {PENDING} ELSE frontier.status END
+                WHERE excluded.priority > frontier.priority
+            """).rowcount
+            conn.commit()
+            return changed
+
+    def claim_pending_url(self, skip=None):
+        """Atomically pick the next due pending URL and lease it as 'processing'.
+
+        URLs matching the optional `skip` predicate stay pending.
+        """
+        now = int(time.time())
+        source, scope = (URL_JOIN, f"AND NOT in_scope({URL_EXPR})") if skip else ("frontier f", "")
+        with closing(self._connect_scoped(skip) if skip else sqlite3.connect(self.db_path)) as conn:
+            self._reclaim(conn, now)
+            row = conn.execute(f"""
+                UPDATE frontier SET status = {PROCESSING}, last_updated = {NOW}, lease_until = ?
+                WHERE id = (SELECT f.id FROM {source} WHERE f.status = {PENDING} AND f.next_attempt_at <= ? {scope}
+                            ORDER BY f.priority DESC, f.last_updated DESC LIMIT 1)
+                RETURNING id, depth
+            """, (now + self.lease_seconds, now)).fetchone()
+            conn.commit()
+            return (self._url_of(conn, row[0]), row[1]) if row else None
+
+    def _reclaim(self, conn, lease_expired_before):
+        """Re-queue 'processing' rows whose lease ended; this counts as a failed attempt."""
+        return conn.execute(f"""
+            UPDATE frontier SET
+                status = CASE WHEN attempts + 1 >= ? THEN {FAILED} ELSE {PENDING} END,
+                attempts = attempts + 1, error_class = 'lease_expired', next_attempt_at = 0
+            WHERE status = {PROCESSING} AND lease_until < ?
+        """, (self.max_attempts, lease_expired_before)).rowcount
+
+    def reclaim_all(self):
+        """Release every 'processing' row, e.g. left behind by a run that was killed."""
+        with sqlite3.connect(self.db_path) as conn:
+            reclaimed = self._reclaim(conn, float("inf"))
+            conn.commit()
+            return reclaimed
+
+    def record_failure(self, url, error_class):
+        """Count a failed attempt and schedule a retry, or mark the URL 'failed' for good.
+
+        Returns the delay in seconds until the retry, or None if it will not be retried.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            key = self._find(conn, url)
+            row = conn.execute("SELECT attempts FROM frontier WHERE id = ?", (key,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            delay = None
+            if is_retryable(error_class) and attempts < self.max_attempts:
+                delay = backoff_delay(attempts, self.base_delay, self.max_delay)
+            conn.execute(f"""
+                UPDATE frontier SET status = ?, attempts = ?, error_class = ?, next_attempt_at = ?, last_updated = {NOW}
+                WHERE id = ?
+            """, (FAILED if delay is None else PENDING, attempts, error_class,
+                  0 if delay is None else int(time.time() + delay), key))
+            conn.commit()
+            return delay
+
+    def seconds_until_next_attempt(self):
+        """Time until the earliest scheduled retry, or None if nothing is waiting."""
+        with sqlite3.connect(self.db_path) as conn:
+            (due,) = conn.execute(f"SELECT MIN(next_attempt_at) FROM frontier WHERE status = {PENDING}").fetchone()
+        return None if due is None else max(0, due - time.time())
+
+    def requeue_failed(self, error_class=None):
+        """Give 'failed' URLs (optionally of one error class) a fresh set of attempts."""
+        query = f"UPDATE frontier SET status = {PENDING}, attempts = 0, next_attempt_at = 0 WHERE status = {FAILED}"
+        params = ()
+        if error_class:
+            query += " AND error_class = ?"
+            params = (error_class,)
+        with sqlite3.connect(self.db_path) as conn:
+            requeued = conn.execute(query, params).rowcount
+            conn.commit()
+            return requeued
+
+    def update_status(self, url, status):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(f"UPDATE frontier SET status = ?, last_updated = {NOW} WHERE id = ?", (STATUS_CODES[status], self._find(conn, url)))
+            conn.commit()
+
+    def _connect_scoped(self, predicate):
+        """Connection with `in_scope(url)` bound to `predicate`, for moving rows between DBs."""
+        conn = sqlite3.connect(self.db_path)
+        conn.create_function("in_scope", 1, predicate, deterministic=True)
+        return conn
+
+    def _scoped_ids(self, predicate):
+        """Frontier ids of the rows whose URL matches `predicate`, scanned SHARD_CHUNK rows at a time."""
+        ids, last = [], None
+        with closing(self._connect_scoped(predicate)) as conn:
+            while True:
+                rows = conn.execute(f"""
+                    SELECT f.id, in_scope({URL_EXPR}) FROM {URL_JOIN}
+                    WHERE ? IS NULL OR f.id > ? ORDER BY f.id LIMIT ?
+                """, (last, last, SHARD_CHUNK)).fetchall()
+                if not rows: return ids
+                ids += [key for key, matches in rows if matches]
+                last = rows[-1][0]
+
+    def export_urls(self, target_path, predicate):
+        """Copy the rows whose URL matches `predicate` into a fresh state DB at `target_path`."""
+        if os.path.exists(target_path): os.remove(target_path)
+        StateManager(target_path)
+        ids = self._scoped_ids(predicate)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("ATTACH DATABASE ? AS target", (target_path,))
+            conn.execute("INSERT INTO target.hosts SELECT * FROM hosts")
+            conn.execute("INSERT INTO target.prefixes SELECT * FROM prefixes")
+            conn.commit()
+            for i in range(0, len(ids), SHARD_CHUNK):
+                conn.executemany("INSERT INTO target.frontier SELECT * FROM frontier WHERE id = ?", ((key,) for key in ids[i:i + SHARD_CHUNK]))
+                conn.commit()
+        with closing(sqlite3.connect(target_path)) as conn:
+            # Keys probed past rows that were not exported must move back
+            self._rehome(conn)
+            conn.commit()
+        return len(ids)
+
+    def import_urls(self, source_path, predicate):
+        """Merge matching rows from another state DB (e.g. a shard's previous owner).
+
+        Rows it was still processing come back as pending. Imported rows win over
+        local ones that are merely pending, so finished work is not redone.
+        """
+        StateManager(source_path)  # bring its schema up to date first
+        with closing(self._connect_scoped(predicate)) as conn:
+            conn.execute("ATTACH DATABASE ? AS source", (source_path,))
+            rows = conn.execute(f"""
+                SELECT {URL_EXPR}, CASE f.status WHEN {PROCESSING} THEN {PENDING} ELSE f.status END, f.depth, f.priority,
+                       f.last_updated, f.error_class, f.attempts, f.next_attempt_at, 0
+                FROM source.frontier f JOIN source.prefixes p ON p.id = f.prefix_id JOIN source.hosts h ON h.id = p.host_id
+                WHERE in_scope({URL_EXPR})
+            """).fetchall()
+            self._stage(conn, rows)
+            n = conn.execute(f"""
+                INSERT INTO frontier ({FRONTIER_COLUMNS}) SELECT {FRONTIER_COLUMNS} FROM incoming WHERE true
+                ON CONFLICT(id) DO UPDATE SET
+                    status = excluded.status, priority = MAX(frontier.priority, excluded.priority),
+                    last_updated = excluded.last_updated, error_class = excluded.error_class,
+                    attempts = excluded.attempts, next_attempt_at = excluded.next_attempt_at
+                WHERE frontier.status = {PENDING}
+            """).rowcount
+            conn.commit()
+            return n
+
+    def processing_count(self, predicate):
+        """Rows matching `predicate` that a worker is processing right now."""
+        with closing(self._connect_scoped(predicate)) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {URL_JOIN} WHERE f.status = {PROCESSING} AND in_scope({URL_EXPR})").fetchone()[0]
+
+    def drop_urls(self, predicate):
+        """Forget the rows whose URL matches `predicate` (a shard handed to another node)."""
+        ids = self._scoped_ids(predicate)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            for i in range(0, len(ids), SHARD_CHUNK):
+                conn.executemany("DELETE FROM frontier WHERE id = ?", ((key,) for key in ids[i:i + SHARD_CHUNK]))
+                # In the same transaction, so no lookup ever sees a broken probe chain
+                self._rehome(conn)
+                conn.commit()
+        return len(ids)
+
+    def url_status(self, url):
+        """(status, attempts, error_class, last_updated) of one URL, or None."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT status, attempts, error_class, datetime(last_updated, 'unixepoch') FROM frontier WHERE id = ?",
+                               (self._find(conn, url),)).fetchone()
+            return (STATUSES[row[0]], *row[1:]) if row else None
+
+    def urls_with_status(self, status):
+        with sqlite3.connect(self.db_path) as conn:
+            return [url for (url,) in conn.execute(f"SELECT {URL_EXPR} FROM {URL_JOIN} WHERE f.status = ?", (STATUS_CODES[status],))]
+
+    def get_meta(self, name, default=None):
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+            return row[0] if row else default
+
+    def set_meta(self, name, value):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+            conn.commit()
+
+    def record_uploads(self, rows):
+        """Add (key, url, size, etag) rows for objects just written to the store."""
+        now = int(time.time())
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("INSERT OR REPLACE INTO manifest (key, url, size, etag, uploaded_at, missing) VALUES (?, ?, ?, ?, ?, 0)",
+                             ((key, url, size, etag, now) for key, url, size, etag in rows))
+            conn.commit()
+
+    def recent_uploads(self, limit=50):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT key, url, size, etag, uploaded_at, missing FROM manifest ORDER BY uploaded_at DESC LIMIT ?",
+                                (limit,)).fetchall()
+
+    def uploads_for_url(self, url):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT key, url, size, etag, uploaded_at, missing FROM manifest WHERE url = ? ORDER BY key",
+                                (url,)).fetchall()
+
+    def manifest_summary(self):
+        """(objects, total bytes, objects missing from the bucket)."""
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(missing), 0) FROM manifest").fetchone()
+
+    def reconcile_manifest(self, objects, start_after, last_key, url_for_key, listed_at):
+        """Compare one listed slice of the bucket, (start_after, last_key], with the manifest.
+
+        `objects` are the store's object dicts for that key range. Unknown keys are
+        added (URL from `url_for_key`, which may return None), changed size/ETag
+        updated, and manifest keys in the range that were not listed marked missing
+        (unless they were uploaded after `listed_at`). Returns a dict of counts.
+        """
+        counts = {"added": 0, "changed": 0, "missing": 0}
+        with sqlite3.connect(self.db_path) as conn:
+            known, uploaded = {}, {}
+            for key, size, etag, missing, uploaded_at in conn.execute(
+                    "SELECT key, size, etag, missing, uploaded_at FROM manifest WHERE key > ? AND key <= ?", (start_after, last_key)):
+                known[key], uploaded[key] = (size, etag, missing), uploaded_at
+            listed = set()
+            for obj in objects:
+                key = obj["Key"]
+                listed.add(key)
+                current = (obj["Size"], obj["ETag"], 0)
+                if key not in known:
+                    counts["added"] += 1
+                    conn.execute("INSERT INTO manifest (key, url, size, etag, uploaded_at, missing) VALUES (?, ?, ?, ?, ?, 0)",
+                                 (key, url_for_key(key), obj["Size"], obj["ETag"], int(obj["LastModified"].timestamp())))
+                elif known[key] != current:
+                    counts["changed"] += 1
+                    conn.execute("UPDATE manifest SET size = ?, etag = ?, uploaded_at = ?, missing = 0 WHERE key = ?",
+                                 (obj["Size"], obj["ETag"], int(obj["LastModified"].timestamp()), key))
+            gone = [key for key in known if key not in listed and uploaded[key] < listed_at]
+            conn.executemany("UPDATE manifest SET missing = 1 WHERE key = ?", ((key,) for key in gone))
+            counts["missing"] = len(gone)
+            conn.commit()
+        return counts
+
+    def record_llm_call(self, row):
+        """Add one extract.usage_row()."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(f"INSERT INTO llm_calls ({LLM_CALL_COLUMNS}) VALUES ({', '.join('?' * 11)})", row)
+            conn.commit()
+
+    def llm_usage(self, since=0):
+        """(schema, page_type, calls, avg prompt, avg completion, avg reasoning, avg latency, calls cut off by max_tokens)."""
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("""
+                SELECT schema, page_type, COUNT(*), AVG(prompt_tokens), AVG(completion_tokens), AVG(reasoning_tokens),
+                       AVG(latency), SUM(finish_reason = 'length')
+                FROM llm_calls WHERE called_at >= ? GROUP BY schema, page_type ORDER BY schema, page_type
+            """, (since,)).fetchall()
+
+    def status_counts(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return {STATUSES[status]: n for status, n in conn.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status")}
+
+    def error_counts(self):
+        """(status, error_class) -> count for URLs that have failed at least once."""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute("SELECT status, error_class, COUNT(*) FROM frontier WHERE error_class IS NOT NULL GROUP BY status, error_class")
+            return {(STATUSES[status], error_class): n for status, error_class, n in rows}
+
+    def snapshot(self, target_path):
+        """Consistent copy of the DB (safe to upload while the crawl keeps writing)."""
+        with sqlite3.connect(self.db_path) as src, sqlite3.connect(target_path) as dst:
+            src.backup(dst)
+        return target_path
@@ -0,0 +1,157 @@
+"""Store stage backends: extracted files and state DB backups."""
+import asyncio
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from crawlai.config import OUTPUT_PREFIX
+
+# What put_text stored: `link` is a presigned URL (S3) or a local path, for the logs
+StoredObject = namedtuple("StoredObject", "key link size etag")
+
+
+def output_key(url, ext):
+    """Object key for a page's extracted output, e.g. extracted_data/rclone_org_docs.json."""
+    base_name = url.replace("https://", "").replace("/", "_").replace(".", "_")
+    return f"{OUTPUT_PREFIX}/{base_name}.{ext}"
+
+
+UPLOAD_THREADS = 4
+
+
+class S3Store:
+    """Wasabi (or any S3 endpoint) through boto3, with uploads on a small thread pool."""
+
+    def __init__(self, config):
+        import boto3
+        from botocore.config import Config
+
+        settings = config["s3"]
+        self.s3 = boto3.client(
+            's3',
+            endpoint_url=settings["endpoint_url"],
+            aws_access_key_id=settings["access_key"],
+            aws_secret_access_key=settings["secret_key"],
+            config=Config(signature_version='s3v4', max_pool_connections=config["s3_max_pool_connections"])
+        )
+        self.bucket = settings["bucket"]
+        # Thread pool for non-blocking S3 uploads
+        self.executor = ThreadPoolExecutor(max_workers=UPLOAD_THREADS)
+
+    def presigned_url(self, key):
+        # Generate presigned URL for instant review (valid for 1 hour)
+        return self.s3.generate_presigned_url('get_object', Params={'Bucket': self.bucket, 'Key': key}, ExpiresIn=3600)
+
+    async def put_text(self, key, text, content_type="text/plain; charset=utf-8"):
+        loop = asyncio.get_running_loop()
+        body = text.encode("utf-8")
+        try:
+            response = await loop.run_in_executor(self.executor, lambda: self.s3.put_object(
+                Bucket=self.bucket, Key=key, Body=body, ContentType=content_type))
+            return StoredObject(key, self.presigned_url(key), len(body), response['ETag'])
+        except Exception as e:
+            print(f"  [S3 ERR] Failed to upload {key}: {e}")
+            return None
+
+    async def upload_file(self, local_path, key):
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, self.s3.upload_file, local_path, self.bucket, key)
+            return self.presigned_url(key)
+        except Exception as e:
+            print(f"  [S3 ERR] Failed to upload {local_path}: {e}")
+            return None
+
+    def get_text(self, key):
+        return self.s3.get_object(Bucket=self.bucket, Key=key)['Body'].read().decode('utf-8')
+
+    def get_versioned(self, key):
+        """(text, ETag) of an object, or (None, None) if it does not exist."""
+        try:
+            obj = self.s3.get_object(Bucket=self.bucket, Key=key)
+        except self.s3.exceptions.NoSuchKey:
+            return None, None
+        return obj['Body'].read().decode('utf-8'), obj['ETag']
+
+    def put_object(self, key, body, if_match=None, if_none_match=False):
+        """Blocking write, optionally conditional on the current ETag (or on the key not existing).
+
+        Returns the new ETag, or None if the precondition failed because another
+        writer got there first. The endpoint must support conditional PUTs.
+        """
+        from botocore.exceptions import ClientError
+
+        conditions = {}
+        if if_match: conditions['IfMatch'] = if_match
+        if if_none_match: conditions['IfNoneMatch'] = '*'
+        if isinstance(body, str): body = body.encode('utf-8')
+        try:
+            return self.s3.put_object(Bucket=self.bucket, Key=key, Body=body, **conditions)['ETag']
+        except ClientError as e:
+            if e.response['ResponseMetadata']['HTTPStatusCode'] in (409, 412): return None
+            raise
+
+    def delete(self, key):
+        self.s3.delete_object(Bucket=self.bucket, Key=key)
+
+    def list_objects(self, prefix, start_after=""):
+        """Yield S3 object dicts (Key, Size, ETag, LastModified) under `prefix`, in key order."""
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix, StartAfter=start_after):
+            yield from page.get('Contents', [])
+
+    def download_file(self, key, local_path):
+        try:
+            self.s3.download_file(self.bucket, key, local_path)
+            print(f"  [S3] Restored {key} from cloud.")
+            return True
+        except Exception:
+            print(f"  [S3] No cloud backup of {key} found, starting fresh.")
+            return False
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class LocalStore:
+    """Write results under config['output_dir']; state stays where it is."""
+
+    def __init__(self, config):
+        self.root = config["output_dir"]
+
+    async def put_text(self, key, text, content_type=None):
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f: f.write(text)
+        st = os.stat(path)
+        return StoredObject(key, path, st.st_size, self._etag(st))
+
+    @staticmethod
+    def _etag(st):
+        return f'"{st.st_size}-{st.st_mtime_ns}"'
+
+    async def upload_file(self, local_path, key):
+        return None
+
+    def get_text(self, key):
+        with open(os.path.join(self.root, key), encoding="utf-8") as f: return f.read()
+
+    def list_objects(self, prefix, start_after=""):
+        """Same shape and order as S3Store.list_objects; the ETag is size+mtime rather than an MD5."""
+        top = os.path.join(self.root, os.path.dirname(prefix))
+        keys = []
+        for dirpath, _, filenames in os.walk(top):
+            for name in filenames:
+                key = os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/")
+                if key.startswith(prefix) and key > start_after: keys.append(key)
+        for key in sorted(keys):
+            st = os.stat(os.path.join(self.root, key))
+            yield {"Key": key, "Size": st.st_size, "ETag": self._etag(st),
+                   "LastModified": datetime.fromtimestamp(st.st_mtime, tz=timezone.utc)}
+
+    def download_file(self, key, local_path):
+        return False
+
+    def close(self):
+        pass
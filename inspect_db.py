@@ -15,6 +15,20 @@ cursor.execute("SELECT status, COUNT(*) FROM urls GROUP BY status")
 for row in cursor.fetchall():
     print(f"  {row[0]}: {row[1]}")
 
+columns = [row[1] for row in cursor.execute("PRAGMA table_info(urls)")]
+if "error_class" in columns:
+    print("\nFailures by error class (pending = retry scheduled):")
+    cursor.execute("SELECT error_class, status, COUNT(*), MAX(attempts) FROM urls WHERE error_class IS NOT NULL GROUP BY error_class, status ORDER BY COUNT(*) DESC")
+    for row in cursor.fetchall():
+        print(f"  {row[0]:<15} | {row[1]:<10} | {row[2]} (max attempts {row[3]})")
+
+tables = [row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+if "llm_calls" in tables:
+    print("\nLLM token usage by schema and page type:")
+    cursor.execute("SELECT schema, page_type, COUNT(*), AVG(prompt_tokens), AVG(completion_tokens), AVG(latency), SUM(finish_reason = 'length') FROM llm_calls GROUP BY schema, page_type")
+    for row in cursor.fetchall():
+        print(f"  {row[0]:<8} | {row[1]:<6} | {row[2]} calls | avg {row[3] or 0:.0f} in / {row[4] or 0:.0f} out tokens | {row[5]:.1f}s | {row[6]} cut off")
+
 print("\nRecent 10 processed/processing URLs:")
 cursor.execute("SELECT url, status, last_updated FROM urls WHERE status != 'pending' ORDER BY last_updated DESC LIMIT 10")
 for row in cursor.fetchall():